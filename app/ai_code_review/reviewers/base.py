@@ -1,28 +1,29 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+# slots + frozen: no per-instance __dict__ and cheaper attribute reads.
+@dataclass(slots=True, frozen=True)
 class Issue:
-    language: str
-    file_path: str
-    line_start: int
-    line_end: int
-    severity: str            # "LOW"|"MEDIUM"|"HIGH"|"CRITICAL"
-    category: str            # "Security"|"Reliability"|"Maintainability"|"Performance"|"Style"
-    title: str
-    detail: str
-    remediation: str
-    confidence: str          # "High"|"Medium"|"Low"
+    language: str = ""
+    file_path: str = ""
+    line_start: int = 1
+    line_end: int = 1
+    severity: str = "MEDIUM"            # "LOW"|"MEDIUM"|"HIGH"|"CRITICAL"
+    category: str = "Maintainability"   # "Security"|"Reliability"|"Maintainability"|"Performance"|"Style"
+    title: str = "Issue"
+    detail: str = ""
+    remediation: str = ""
+    confidence: str = "Medium"          # "High"|"Medium"|"Low"
     rule_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ReviewResult:
-    issues: List[Issue]
-    checklist: List[Dict[str, Any]]  # {category,item,result,notes}
-    overall: str                     # "PASS"|"FAIL"
-    summary: str
+    issues: List[Issue] = field(default_factory=list)
+    checklist: List[Dict[str, Any]] = field(default_factory=list)  # {category,item,result,notes}
+    overall: str = "PASS"                                          # "PASS"|"FAIL"
+    summary: str = ""
 
 
 class Reviewer:
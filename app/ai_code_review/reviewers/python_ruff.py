@@ -4,6 +4,7 @@ from __future__ import annotations
 import json
 import os
 import subprocess
+import tempfile
 from typing import Dict, List, Optional
 
 from app.ai_code_review.reviewers.base import Reviewer, Issue
@@ -64,7 +65,29 @@ class PythonRuffReviewer(Reviewer):
         # Ruff needs a filesystem context. Most projects run the suite from repo root.
         # If you're running from elsewhere, set RUFF_WORKDIR env var to project root.
         workdir = os.getenv("RUFF_WORKDIR", os.getcwd())
+        return self._run_ruff(workdir)
 
+    def review_shard(self, files: Dict[str, str], language: str) -> List[Issue]:
+        """
+        Reviews one shard of the in-memory files: writes them to a temp folder and runs
+        Ruff there. Shards are independent, so callers can run several in parallel
+        (e.g. one per thread) and simply concatenate the results.
+        """
+        with tempfile.TemporaryDirectory(prefix="ruff_shard_") as td:
+            root = os.path.realpath(td)
+            for path, text in (files or {}).items():
+                target = os.path.realpath(os.path.join(root, path))
+                # never write outside the shard folder (e.g. "../" entries in a ZIP)
+                if not target.startswith(root + os.sep):
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "w", encoding="utf-8") as f:
+                    f.write(text or "")
+
+            # Report paths relative to the repo, not the temp folder
+            return self._run_ruff(root, strip_prefix=root.replace("\\", "/") + "/")
+
+    def _run_ruff(self, workdir: str, strip_prefix: str = "") -> List[Issue]:
         try:
             # JSON output gives us file + row + col reliably
             cmd = ["python", "-m", "ruff", "check", ".", "--output-format", "json"]
@@ -140,6 +163,8 @@ class PythonRuffReviewer(Reviewer):
             code = (f.get("code") or "").strip()
             msg = (f.get("message") or "").strip()
             path = (f.get("filename") or "").replace("\\", "/")
+            if strip_prefix and path.startswith(strip_prefix):
+                path = path[len(strip_prefix):]
             loc = f.get("location") or {}
             end_loc = f.get("end_location") or loc
 
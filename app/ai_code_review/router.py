@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import operator
 import os
 import time
 import uuid
@@ -8,11 +9,14 @@ import urllib.parse
 import urllib.error
 import re
 import subprocess
+import zipfile
+from collections import Counter
 from io import BytesIO
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 # ReportLab (PDF tables)
 from reportlab.lib import colors
@@ -30,7 +34,9 @@ from app.ai_code_review.reviewers.canvas_msapp import CanvasMsappReviewer
 from app.ai_code_review.reviewers.llm_fallback import LLMFallbackReviewer
 
 from app.ai_code_review.utils.zip_reader import (
-    read_zip_in_memory,
+    is_probably_zip,
+    open_zip_in_memory,
+    open_zip_from_fileobj,
     normalize_zip_entries,
     as_text_files,
     extract_binary,
@@ -187,64 +193,75 @@ def _download_github_zip(repo_url: str, branch: str) -> bytes:
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "ai-sdlc-suite"})
         with urllib.request.urlopen(req, timeout=30) as r:
-            return r.read()
+            data = r.read()
     except urllib.error.HTTPError as e:
         raise HTTPException(status_code=400, detail=f"Failed to download repo ZIP (HTTP {e.code}).")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to download repo ZIP: {e}")
 
+    if not is_probably_zip(data):
+        raise HTTPException(status_code=400, detail="Downloaded repo archive is not a valid ZIP.")
+    return data
+
+
+_ISSUE_UI_FIELDS = operator.attrgetter(
+    "file_path", "line_start", "line_end", "severity", "category", "title", "remediation"
+)
+
 
 def _issues_to_ui(issues: List[Issue]) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     for it in issues or []:
-        fp = getattr(it, "file_path", "") or ""
-        ls = getattr(it, "line_start", 1) or 1
-        le = getattr(it, "line_end", ls) or ls
+        fp, ls, le, sev, cat, title, rem = _ISSUE_UI_FIELDS(it)
+        ls = ls or 1
+        le = le or ls
 
         location = "—"
         if fp:
             location = f"{fp}:{ls}" if le == ls else f"{fp}:{ls}-{le}"
 
-        remediation = getattr(it, "remediation", "") or "—"
-
         out.append(
             {
-                "severity": getattr(it, "severity", "") or "MEDIUM",
-                "category": getattr(it, "category", "") or "Maintainability",
-                "title": getattr(it, "title", "") or "Issue",
+                "severity": sev or "MEDIUM",
+                "category": cat or "Maintainability",
+                "title": title or "Issue",
                 "location": location,
-                "remediation": remediation,
+                "remediation": rem or "—",
             }
         )
     return out
 
 
-def _make_checklist(issues: List[Issue]) -> List[Dict[str, str]]:
-    buckets = {"Security": 0, "Reliability": 0, "Maintainability": 0, "Performance": 0, "Style": 0}
+_CHECKLIST_CATEGORIES = ("Security", "Reliability", "Maintainability", "Performance", "Style")
+_CHECKLIST_CATEGORY_SET = frozenset(_CHECKLIST_CATEGORIES)
+_CHECKLIST_CHECKS = {
+    "Security": "No hard-coded secrets or critical vulnerabilities",
+    "Reliability": "Proper error handling and stability",
+    "Maintainability": "Readable, modular, maintainable solution",
+    "Performance": "No obvious performance bottlenecks",
+    "Style": "Consistent standards and conventions",
+}
 
-    def norm(cat: str) -> str:
-        c = (cat or "").strip()
-        return c if c in buckets else "Maintainability"
 
-    for it in issues or []:
-        buckets[norm(getattr(it, "category", ""))] += 1
+def _norm_category(cat: str) -> str:
+    if cat in _CHECKLIST_CATEGORY_SET:
+        return cat
+    c = (cat or "").strip()
+    return c if c in _CHECKLIST_CATEGORY_SET else "Maintainability"
+
+
+def _make_checklist(issues: List[Issue]) -> List[Dict[str, str]]:
+    counts = Counter(_norm_category(it.category) for it in issues or [])
 
-    def row(cat: str, check: str) -> Dict[str, str]:
-        count = buckets.get(cat, 0)
-        return {
+    return [
+        {
             "category": cat,
-            "check": check,
-            "status": "FAIL" if count else "PASS",
-            "evidence": f"{count} issue(s) found" if count else "",
+            "check": _CHECKLIST_CHECKS[cat],
+            "status": "FAIL" if counts[cat] else "PASS",
+            "evidence": f"{counts[cat]} issue(s) found" if counts[cat] else "",
             "remediation": "",
         }
-
-    return [
-        row("Security", "No hard-coded secrets or critical vulnerabilities"),
-        row("Reliability", "Proper error handling and stability"),
-        row("Maintainability", "Readable, modular, maintainable solution"),
-        row("Performance", "No obvious performance bottlenecks"),
-        row("Style", "Consistent standards and conventions"),
+        for cat in _CHECKLIST_CATEGORIES
     ]
 
 
@@ -326,9 +343,12 @@ async def review(
             _set_sid_cookie(resp, sid)
             return resp
 
-        zip_bytes = await project_zip.read()
+        # Size from the spooled upload itself; the archive is never copied
+        # into a bytes object (large uploads are memory-mapped from disk)
+        upload = project_zip.file
+        upload.seek(0, os.SEEK_END)
         max_bytes = MAX_ZIP_MB_UPLOAD * 1024 * 1024
-        if len(zip_bytes) > max_bytes:
+        if upload.tell() > max_bytes:
             resp = render(
                 request,
                 "index.html",
@@ -338,17 +358,26 @@ async def review(
             _set_sid_cookie(resp, sid)
             return resp
 
+        try:
+            archive = open_zip_from_fileobj(upload)
+        except zipfile.BadZipFile:
+            resp = render(request, "index.html", {"error": "Uploaded file is not a valid ZIP."}, status_code=400)
+            _set_sid_cookie(resp, sid)
+            return resp
+
         display_name = project_zip.filename or project_name.strip() or "Project"
     else:
         # repo already validated above
-        zip_bytes = _download_github_zip(repo, branch)
+        archive = open_zip_in_memory(_download_github_zip(repo, branch))
         display_name = project_name.strip() or repo.rstrip("/").split("/")[-1]
 
     # ZIP -> files
-    entries = normalize_zip_entries(read_zip_in_memory(zip_bytes))
-    text_files = as_text_files(entries)
-    msapps = extract_binary(entries, extensions={".msapp"})
-    files = filter_files_for_review(text_files)
+    with archive:
+        entries = normalize_zip_entries(archive)
+        text_files = as_text_files(entries)
+        msapps = extract_binary(entries, extensions={".msapp"})
+    truncated: Set[str] = set()
+    files = filter_files_for_review(text_files, truncated)
 
     languages = detect_languages(files)
     issues: List[Issue] = []
@@ -393,6 +422,7 @@ async def review(
         "repo": repo,
         "branch": branch,
         "files_after_filter": len(files),
+        "files_truncated": sorted(truncated),
         "top_files": sorted(list(files.keys()))[:20],
         "languages": languages,
     }
@@ -433,20 +463,11 @@ async def review(
     return resp
 
 
-# ✅ PDF TABLE ENDPOINT (works at /ai-code-review/report/{id}/pdf once router is mounted with prefix)
-@router.get("/report/{report_id}/pdf")
-def report_pdf(request: Request, report_id: str):
-    _cleanup_cache()
-    sid = _get_or_create_sid(request)
-
-    item = REPORT_CACHE.get(report_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Report not found or expired.")
-
-    # ✅ Prevent accessing other session’s reports
-    if item.get("sid") != sid:
-        raise HTTPException(status_code=404, detail="Report not found or expired.")
-
+def _build_report_pdf(report_id: str, item: Dict[str, Any]) -> BytesIO:
+    """
+    Builds the report PDF into memory. CPU-bound (ReportLab layout), so the
+    endpoint runs it in the threadpool instead of on the event loop.
+    """
     issues = item.get("issues_ui", []) or []
     checklist = item.get("checklist", []) or []
     meta = item.get("meta", {}) or {}
@@ -569,6 +590,24 @@ def report_pdf(request: Request, report_id: str):
 
     doc.build(story)
     buf.seek(0)
+    return buf
+
+
+# ✅ PDF TABLE ENDPOINT (works at /ai-code-review/report/{id}/pdf once router is mounted with prefix)
+@router.get("/report/{report_id}/pdf")
+async def report_pdf(request: Request, report_id: str):
+    _cleanup_cache()
+    sid = _get_or_create_sid(request)
+
+    item = REPORT_CACHE.get(report_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Report not found or expired.")
+
+    # ✅ Prevent accessing other session’s reports
+    if item.get("sid") != sid:
+        raise HTTPException(status_code=404, detail="Report not found or expired.")
+
+    buf = await run_in_threadpool(_build_report_pdf, report_id, item)
 
     filename = f"code_review_{report_id}.pdf"
     resp = StreamingResponse(
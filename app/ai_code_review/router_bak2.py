@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import os
 import time
 import uuid
 import urllib.request
 import urllib.parse
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from typing import Any, Dict, List, Optional
 
@@ -49,6 +52,30 @@ llm_reviewer = LLMFallbackReviewer()
 REPORT_CACHE: Dict[str, Dict[str, Any]] = {}
 REPORT_TTL_SECONDS = 30 * 60
 MAX_ZIP_MB_UPLOAD = int(os.getenv("MAX_ZIP_MB_UPLOAD", "500"))
+REVIEW_WORKERS = max(1, int(os.getenv("REVIEW_WORKERS", str(os.cpu_count() or 1))))
+
+# Each shard runs Ruff as its own subprocess, so threads only write temp files
+# and wait on it; no need to fork copies of the server. Threads start lazily.
+_REVIEW_POOL = ThreadPoolExecutor(max_workers=REVIEW_WORKERS, thread_name_prefix="ruff-shard")
+
+
+async def _review_python_sharded(files: Dict[str, str]) -> List[Issue]:
+    """
+    Splits the python files into REVIEW_WORKERS shards and runs one Ruff process
+    per shard from the thread pool. Issues are per-file, so merging is a plain concatenation.
+    """
+    items = sorted((p, t) for p, t in files.items() if p.lower().endswith(".py"))
+    if not items:
+        return []
+
+    n = min(REVIEW_WORKERS, len(items))
+    shards = [dict(itertools.islice(items, i, None, n)) for i in range(n)]
+
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_REVIEW_POOL, python_reviewer.review_shard, shard, "python") for shard in shards)
+    )
+    return list(itertools.chain.from_iterable(results))
 
 
 def _cleanup_cache() -> None:
@@ -188,7 +215,7 @@ async def review(
     issues: List[Issue] = []
 
     if "python" in languages:
-        issues.extend(python_reviewer.review(files, "python"))
+        issues.extend(await _review_python_sharded(files))
 
     if "powerplatform" in languages:
         issues.extend(powerplatform_reviewer.review(files, "powerplatform"))
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import os
-from typing import Dict
+from typing import Dict, Optional, Set
 
 
 # Folders we never want to scan (noise, binaries, dependencies, build outputs)
@@ -50,11 +50,14 @@ def _is_in_excluded_dir(path_norm: str) -> bool:
     return any(part in EXCLUDED_DIRS for part in parts)
 
 
-def filter_files_for_review(files: Dict[str, str]) -> Dict[str, str]:
+def filter_files_for_review(files: Dict[str, str], truncated: Optional[Set[str]] = None) -> Dict[str, str]:
     """
     Takes dict[path -> decoded text], returns a filtered dict[path -> text]
     removing junk folders/binaries and keeping relevant code/config/docs.
 
+    Files longer than MAX_FILE_CHARS are cut to that length; pass a set as
+    `truncated` to collect their paths.
+
     IMPORTANT: Do NOT restrict to 'app/' only.
     That was the main reason repo scans became shallow/fast.
     """
@@ -87,13 +90,17 @@ def filter_files_for_review(files: Dict[str, str]) -> Dict[str, str]:
             continue
 
         text = content or ""
-        text = text.strip()
+        # Only pay for a full-string copy when there is whitespace to strip
+        if text[:1].isspace() or text[-1:].isspace():
+            text = text.strip()
         if not text:
             continue
 
-        # Safety cap per file
+        # Safety cap per file (tracked out-of-band, no marker appended)
         if len(text) > MAX_FILE_CHARS:
-            text = text[:MAX_FILE_CHARS] + "\n\n[TRUNCATED: file too large]"
+            text = text[:MAX_FILE_CHARS]
+            if truncated is not None:
+                truncated.add(p)
 
         filtered[p] = text
 
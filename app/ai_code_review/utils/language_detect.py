@@ -1,3 +1,4 @@
+import hashlib
 from collections import Counter
 from typing import Dict, List
 
@@ -44,7 +45,30 @@ MANIFEST_HINTS = {
 }
 
 
+# Detection only looks at paths, so results are cached per set of paths
+_LANG_CACHE: Dict[bytes, List[str]] = {}
+_LANG_CACHE_MAX = 32
+
+
+def _paths_fingerprint(files: Dict[str, str]) -> bytes:
+    return hashlib.blake2b("\x00".join(sorted(files)).encode("utf-8"), digest_size=16).digest()
+
+
 def detect_languages(files: Dict[str, str]) -> List[str]:
+    fp = _paths_fingerprint(files)
+    cached = _LANG_CACHE.get(fp)
+    if cached is not None:
+        return list(cached)
+
+    langs = _detect_languages(files)
+
+    if len(_LANG_CACHE) >= _LANG_CACHE_MAX:
+        _LANG_CACHE.pop(next(iter(_LANG_CACHE)))  # drop oldest
+    _LANG_CACHE[fp] = langs
+    return list(langs)
+
+
+def _detect_languages(files: Dict[str, str]) -> List[str]:
     counter = Counter()
 
     for path in files.keys():
@@ -1,17 +1,31 @@
 import io
-import json
 import re
 import zipfile
+from codecs import utf_8_decode
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Dict
+from functools import cached_property
+from typing import List, Optional, Dict, Union
+
+from app.ai_code_review.utils.zip_reader import is_probably_zip, read_entry
+
+try:
+    import orjson as _json
+except ImportError:  # stdlib fallback (also accepts bytes)
+    import json as _json
 
 
 @dataclass(frozen=True)
 class MsappArtifact:
     internal_path: str
-    text: str
+    raw: Union[bytes, bytearray]
     kind: str  # "json" | "text"
 
+    @cached_property
+    def text(self) -> str:
+        # Decoded lazily: JSON artifacts are parsed straight from `raw` and only
+        # need text for line lookups / the text-scan fallback.
+        return utf_8_decode(self.raw, "replace", False)[0]
+
 
 @dataclass(frozen=True)
 class CanvasFormulaHit:
@@ -21,7 +35,8 @@ class CanvasFormulaHit:
 
 
 def is_probably_msapp_zip(msapp_bytes: bytes) -> bool:
-    return len(msapp_bytes) >= 4 and msapp_bytes[0:2] == b"PK"
+    # Stub/corrupt blobs fail here instead of in a full ZipFile parse
+    return is_probably_zip(msapp_bytes)
 
 
 def read_msapp_in_memory(msapp_bytes: bytes, max_file_bytes: int = 2_000_000) -> List[MsappArtifact]:
@@ -41,12 +56,10 @@ def read_msapp_in_memory(msapp_bytes: bytes, max_file_bytes: int = 2_000_000) ->
             if not (lower.endswith(".json") or lower.endswith(".txt") or lower.endswith(".fx") or lower.endswith(".yaml")):
                 continue
 
-            with z.open(info) as f:
-                raw = f.read()
-            text = raw.decode("utf-8", errors="replace")
+            raw = read_entry(z, info)
 
             kind = "json" if lower.endswith(".json") else "text"
-            artifacts.append(MsappArtifact(internal_path=name, text=text, kind=kind))
+            artifacts.append(MsappArtifact(internal_path=name, raw=raw, kind=kind))
 
     return artifacts
 
@@ -61,9 +74,9 @@ FX_TOKENS = [
 TOKEN_RE = re.compile("|".join(re.escape(t) for t in FX_TOKENS))
 
 
-def _safe_json_load(text: str) -> Optional[object]:
+def _safe_json_load(text_or_bytes: Union[str, bytes]) -> Optional[object]:
     try:
-        return json.loads(text)
+        return _json.loads(text_or_bytes)
     except Exception:
         return None
 
@@ -100,7 +113,7 @@ def extract_canvas_formula_hits(artifacts: List[MsappArtifact], max_hits: int =
     screens: Dict[str, str] = {}  # internal id -> screen name
     for a in artifacts:
         if a.internal_path.lower().endswith("canvasmanifest.json"):
-            data = _safe_json_load(a.text)
+            data = _safe_json_load(a.raw)
             if isinstance(data, dict):
                 # best-effort: scan for items that look like screens
                 for p, v in _walk_json(data):
@@ -120,12 +133,12 @@ def extract_canvas_formula_hits(artifacts: List[MsappArtifact], max_hits: int =
     for a in artifacts:
         if len(hits) >= max_hits:
             break
-        if len(a.text) > 700_000:
+        if len(a.raw) > 700_000:
             continue
 
         # JSON-based structured extraction (better, if possible)
         if a.kind == "json":
-            data = _safe_json_load(a.text)
+            data = _safe_json_load(a.raw)
             if data is not None:
                 # Find leaf strings that contain known PowerFx tokens
                 for p, v in _walk_json(data):
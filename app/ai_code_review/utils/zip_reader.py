@@ -2,35 +2,411 @@
 from __future__ import annotations
 
 import io
+import mmap
 import os
+import struct
 import zipfile
-from typing import Dict, Iterable, Optional, Set, Tuple
+import zlib
+from codecs import utf_8_decode
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+try:
+    import deflate as _libdeflate  # optional: libdeflate bindings, ~2x faster than zlib
+except ImportError:
+    _libdeflate = None
 
-def read_zip_in_memory(zip_bytes: bytes) -> Dict[str, bytes]:
+# End-of-central-directory record: 22 bytes + a comment of up to 64KB
+_EOCD_SIG = b"PK\x05\x06"
+_EOCD_SEARCH = 22 + 65535
+
+# Both zlib and libdeflate release the GIL while inflating, so entries can be
+# inflated in parallel from plain threads.
+_INFLATE_WORKERS = max(1, int(os.getenv("ZIP_INFLATE_WORKERS", str(os.cpu_count() or 1))))
+_PARALLEL_MIN_ENTRIES = 8
+# Chunk size when draining entries through zipfile (its own reads are 4-8KB)
+_INFLATE_BUF = 64 * 1024
+# read_entry pre-sizes its buffer to at most this and grows it as data
+# arrives, so a declared size alone can't force a large allocation
+_READ_PRESIZE_MAX = 8 * 1024 * 1024
+# Per-entry cap for extract_binary (e.g. .msapp packages)
+_MAX_BINARY_BYTES = int(os.getenv("ZIP_MAX_BINARY_MB", "200")) * 1024 * 1024
+# DEFLATE can't expand by more than ~1032:1; a larger declared size is a lie
+_MAX_DEFLATE_RATIO = 1032
+
+_SLASH_TABLE = str.maketrans("\\", "/")
+
+# Extensions as_text_files never decodes (lowercase, for str.endswith)
+_BINARY_SUFFIXES = (
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".ico",
+    ".exe", ".dll", ".so", ".dylib",
+    ".zip", ".7z", ".rar", ".tar", ".gz",
+    ".pdf", ".docx", ".pptx", ".xlsx",
+    ".pyc", ".class",
+)
+# Longest suffix above; only this many trailing chars need lowercasing
+_SUFFIX_TAIL = max(map(len, _BINARY_SUFFIXES))
+
+
+def is_probably_zip(data: bytes) -> bool:
+    """
+    Cheap sanity check before parsing: local header magic at the start and an
+    end-of-central-directory record near the end.
+    """
+    return (
+        len(data) >= 22
+        and data[:2] == b"PK"
+        and data.rfind(_EOCD_SIG, max(0, len(data) - _EOCD_SEARCH)) >= 0
+    )
+
+
+_LOCAL_HEADER_SIG = b"PK\x03\x04"
+_LOCAL_HEADER_SIZE = 30
+
+
+def _entry_data_offset(data: memoryview, info: zipfile.ZipInfo) -> int:
+    """
+    Offset of the entry payload: local header + its own name/extra fields
+    (the local extra field may differ from the central directory one).
+    """
+    off = info.header_offset
+    if data[off:off + 4] != _LOCAL_HEADER_SIG:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack_from("<HH", data, off + 26)
+    return off + _LOCAL_HEADER_SIZE + name_len + extra_len
+
+
+def _inflate_fast(
+    data: memoryview, info: zipfile.ZipInfo, limit: Optional[int] = None
+) -> Optional[Union[bytes, bytearray]]:
     """
-    Read a ZIP (bytes) and return a dict: { path: raw_bytes }.
+    Inflate a DEFLATE entry straight from the archive buffer into an output of
+    the known size (libdeflate when installed, else raw zlib). Touches no
+    ZipFile state, so it is safe to call from worker threads. Returns None when
+    the entry has to go through zipfile instead (other method, encrypted, bad
+    CRC, declared size over `limit`).
     """
+    if info.compress_type != zipfile.ZIP_DEFLATED or info.flag_bits & 0x1:
+        return None
+    if limit is not None and info.file_size > limit:
+        return None
+    if not info.file_size:
+        return bytearray()
+    try:
+        start = _entry_data_offset(data, info)
+        src = data[start:start + info.compress_size]
+        # libdeflate allocates the declared size up front, so only trust it
+        # when that size is possible for the compressed length; zlib grows
+        # its output as it inflates
+        if _libdeflate is not None and info.file_size <= info.compress_size * _MAX_DEFLATE_RATIO + 64:
+            out = _libdeflate.deflate_decompress(src, info.file_size)
+        else:
+            # Inflate at most one byte past the declared size, so an entry
+            # whose header lies about its size can't expand without bound
+            out = zlib.decompressobj(-zlib.MAX_WBITS).decompress(src, info.file_size + 1)
+    except Exception:
+        return None
+    if len(out) != info.file_size or zlib.crc32(out) != info.CRC:
+        return None
+    return out
+
+
+def _norm_name(name: str) -> str:
+    return name.translate(_SLASH_TABLE).lstrip("/")
+
+
+def _stored_view(data: memoryview, info: zipfile.ZipInfo) -> Optional[memoryview]:
+    """
+    Zero-copy view of a STORED (uncompressed) entry inside the archive buffer.
+    Returns None (zipfile then reads it, and raises on a bad entry) when the
+    stored and declared sizes disagree or the entry runs past the buffer.
+    """
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+        return None
+    if info.file_size != info.compress_size:
+        return None
+    try:
+        start = _entry_data_offset(data, info)
+    except Exception:
+        return None
+    if start + info.file_size > len(data):
+        return None
+    return data[start:start + info.file_size]
+
+
+def _read_fast(
+    data: memoryview, info: zipfile.ZipInfo, limit: Optional[int] = None
+) -> Optional[Union[memoryview, bytes, bytearray]]:
+    if info.compress_type == zipfile.ZIP_STORED:
+        return _stored_view(data, info)
+    return _inflate_fast(data, info, limit)
+
+
+def _read_many(
+    data: memoryview, infos: List[zipfile.ZipInfo], limit: Optional[int] = None
+) -> List[Optional[Union[memoryview, bytes, bytearray]]]:
+    """
+    _read_fast over many entries, fanned out to a thread pool for larger
+    batches. Results are in `infos` order; None means "use zipfile".
+    """
+    if _INFLATE_WORKERS < 2 or len(infos) < _PARALLEL_MIN_ENTRIES:
+        return [_read_fast(data, i, limit) for i in infos]
+    with ThreadPoolExecutor(max_workers=min(_INFLATE_WORKERS, len(infos))) as pool:
+        return list(pool.map(lambda i: _read_fast(data, i, limit), infos))
+
+
+@dataclass
+class LazyZip:
+    """
+    A ZIP with only the central directory parsed.
+    `names` are the normalized entry paths, parallel to `infos`; entry data is
+    inflated on demand, after name/size filters have run. `view` covers the
+    whole archive (in memory or memory-mapped) so STORED entries can be
+    returned without copying.
+    """
+    buf: Union[io.BytesIO, mmap.mmap]
+    zf: zipfile.ZipFile
+    infos: List[zipfile.ZipInfo]
+    names: List[str]
+    view: memoryview
+
+    def __len__(self) -> int:
+        return len(self.infos)
+
+    def close(self) -> None:
+        self.zf.close()
+        if isinstance(self.buf, mmap.mmap):
+            self.view.release()
+            try:
+                self.buf.close()
+            except BufferError:
+                # a zero-copy entry slice is still referenced; unmapped on GC
+                pass
+
+    def __enter__(self) -> "LazyZip":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _open_lazy(zf: zipfile.ZipFile, buf: Union[io.BytesIO, mmap.mmap], view: memoryview) -> LazyZip:
+    infos: List[zipfile.ZipInfo] = []
+    names: List[str] = []
+    for info in zf.infolist():
+        if info.is_dir():
+            continue
+        name = _norm_name(info.filename or "")
+        if not name:
+            continue
+        infos.append(info)
+        names.append(name)
+    return LazyZip(buf=buf, zf=zf, infos=infos, names=names, view=view)
+
+
+def open_zip_in_memory(zip_bytes: bytes) -> LazyZip:
+    """
+    Open a ZIP (bytes) without reading any entry. Directories and empty names
+    are dropped. Raises zipfile.BadZipFile for invalid archives.
+    """
+    buf = io.BytesIO(zip_bytes)
+    return _open_lazy(zipfile.ZipFile(buf, "r"), buf, memoryview(zip_bytes))
+
+
+def _disk_fileno(fp: BinaryIO) -> Optional[int]:
+    # SpooledTemporaryFile.fileno() would force an in-memory spool to disk
+    if not getattr(fp, "_rolled", True):
+        return None
+    try:
+        return fp.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def open_zip_from_fileobj(fp: BinaryIO) -> LazyZip:
+    """
+    Like open_zip_in_memory(), for an uploaded file object. A file on disk is
+    memory-mapped, so entries are sliced from the page cache instead of the
+    whole archive first being copied into bytes; an in-memory spool is read.
+    Raises zipfile.BadZipFile for invalid archives.
+    """
+    fileno = _disk_fileno(fp)
+    if fileno is None:
+        fp.seek(0)
+        data = fp.read()
+        if not is_probably_zip(data):
+            raise zipfile.BadZipFile("File is not a zip file")
+        return open_zip_in_memory(data)
+
+    try:
+        mm = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # empty file
+        raise zipfile.BadZipFile("File is not a zip file")
+    try:
+        if not is_probably_zip(mm):  # type: ignore[arg-type]
+            raise zipfile.BadZipFile("File is not a zip file")
+        # zipfile needs a seekable file object (mmap isn't one before 3.13);
+        # the fallback path reads through `fp`, the fast path through the map
+        fp.seek(0)
+        return _open_lazy(zipfile.ZipFile(fp, "r"), mm, memoryview(mm))
+    except BaseException:
+        mm.close()
+        raise
+
+
+@dataclass
+class ZipBlobs:
+    """
+    Eagerly read ZIP entries as parallel lists: paths[i] -> blobs[i].
+    Cheaper than a dict per entry for archives with many small files; call
+    to_dict() only where keyed lookups are really needed.
+    """
+    paths: List[str]
+    blobs: List[Union[bytes, bytearray, memoryview]]
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def items(self) -> Iterator[Tuple[str, Union[bytes, bytearray, memoryview]]]:
+        return zip(self.paths, self.blobs)
+
+    def to_dict(self) -> Dict[str, Union[bytes, bytearray, memoryview]]:
+        return dict(zip(self.paths, self.blobs))
+
+
+ZipEntries = Union[LazyZip, ZipBlobs, Dict[str, bytes]]
+
+
+def _iter_sized(entries: ZipEntries) -> Iterator[Tuple[str, int, Any]]:
+    """
+    Yields (path, uncompressed_size, handle) for a LazyZip or an eager dict.
+    The handle is a ZipInfo (not read yet) or the bytes themselves.
+    """
+    if isinstance(entries, LazyZip):
+        yield from zip(entries.names, (i.file_size for i in entries.infos), entries.infos)
+        return
+    if isinstance(entries, ZipBlobs):
+        # paths are normalized when the blobs are read
+        yield from ((p, len(b), b) for p, b in entries.items())
+        return
+    for path, data in entries.items():
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            yield _norm_name(path or ""), len(data), data
+
+
+def read_entry(zf: zipfile.ZipFile, info: zipfile.ZipInfo, limit: Optional[int] = None) -> Optional[bytearray]:
+    """
+    Drain one entry through zipfile, _INFLATE_BUF bytes per readinto() call.
+    zipfile never yields more than ZipInfo.file_size, so the output is capped
+    by it; returns None when that size is over `limit`. The buffer starts at
+    min(file_size, _READ_PRESIZE_MAX) and doubles as needed, since file_size
+    comes from the upload and may be a lie.
+    """
+    if limit is not None and info.file_size > limit:
+        return None
+    cap = info.file_size
+    buf = bytearray(min(cap, _READ_PRESIZE_MAX))
+    got = 0
+    with zf.open(info) as f:
+        while True:
+            if got == len(buf):
+                if got >= cap:
+                    break
+                buf.extend(bytes(min(max(got, _INFLATE_BUF), cap - got)))
+            with memoryview(buf) as view, view[got:got + _INFLATE_BUF] as chunk:
+                n = f.readinto(chunk)
+            if not n:
+                break
+            got += n
+    if got < len(buf):
+        del buf[got:]
+    return buf
+
+
+def _materialize_many(
+    entries: ZipEntries, handles: List[Any], limit: Optional[int] = None
+) -> List[Optional[Union[bytes, bytearray, memoryview]]]:
+    """
+    Entry data for the handles yielded by _iter_sized, in the same order.
+    LazyZip entries are inflated in parallel; unreadable ones, and ones that
+    inflate past `limit` bytes, come back None.
+    """
+    if not isinstance(entries, LazyZip):
+        return list(handles)
+
+    # Fast-path output is exactly ZipInfo.file_size, which callers compare
+    # to `limit` before asking for the entry.
+    out = _read_many(entries.view, handles, limit)
+    for idx, data in enumerate(out):
+        if data is not None:
+            continue
+        try:
+            out[idx] = read_entry(entries.zf, handles[idx], limit)
+        except Exception:
+            # ignore unreadable entries
+            pass
+    return out
+
+
+def read_zip_in_memory(zip_bytes: bytes, skip_exts: Tuple[str, ...] = _BINARY_SUFFIXES) -> ZipBlobs:
+    """
+    Read a ZIP (bytes) and return its entries as ZipBlobs (paths, blobs).
+    STORED entries are memoryview slices of `zip_bytes` (no copy).
+    Entries ending in `skip_exts` (lowercase; binary types by default) are
+    dropped by name before inflating. Inflates every other entry up front;
+    prefer open_zip_in_memory() when most entries will be filtered out.
+    """
+    out = ZipBlobs(paths=[], blobs=[])
     if not zip_bytes:
-        return {}
+        return out
 
-    out: Dict[str, bytes] = {}
+    tail = max(map(len, skip_exts), default=0)
+    view = memoryview(zip_bytes)
     with zipfile.ZipFile(io.BytesIO(zip_bytes), "r") as z:
+        names: List[str] = []
+        infos: List[zipfile.ZipInfo] = []
         for info in z.infolist():
             if info.is_dir():
                 continue
-            name = (info.filename or "").replace("\\", "/").lstrip("/")
-            if not name:
+            name = _norm_name(info.filename or "")
+            if not name or name[-tail:].lower().endswith(skip_exts):
                 continue
+            names.append(name)
+            infos.append(info)
+
+        for name, info, data in zip(names, infos, _read_many(view, infos)):
             try:
-                out[name] = z.read(info.filename)
+                if data is None:
+                    data = read_entry(z, info)
             except Exception:
                 # ignore unreadable entries
                 continue
+            out.paths.append(name)
+            out.blobs.append(data)
     return out
 
 
-def normalize_zip_entries(entries: Dict[str, bytes]) -> Dict[str, bytes]:
+def _common_top_folder(keys: List[str]) -> Optional[str]:
+    """
+    Returns the top-level folder shared by every key, or None.
+    Keys must already use "/" separators. Stops at the first key outside
+    the candidate folder.
+    """
+    if not keys:
+        return None
+    top, sep, _ = keys[0].partition("/")
+    if not top or not sep:
+        return None
+    prefix = top + "/"
+    for k in keys:
+        if not k.startswith(prefix):
+            return None
+    return top
+
+
+def normalize_zip_entries(entries: ZipEntries) -> ZipEntries:
     """
     GitHub (and many tools) wrap repo contents in a top-level folder:
       repo-main/app/main.py -> app/main.py
@@ -39,103 +415,103 @@ def normalize_zip_entries(entries: Dict[str, bytes]) -> Dict[str, bytes]:
     if not entries:
         return entries
 
-    keys = [k for k in entries.keys() if isinstance(k, str) and k]
-    if not keys:
-        return entries
+    if isinstance(entries, LazyZip):
+        top = _common_top_folder(entries.names)
+        if not top:
+            return entries
+        cut = len(top) + 1
+        return replace(entries, names=[n[cut:] for n in entries.names])
 
-    # Determine common top folder
-    top = None
-    for k in keys:
-        k2 = k.replace("\\", "/")
-        if "/" not in k2:
-            top = None
-            break
-        first = k2.split("/")[0]
-        if not first:
-            top = None
-            break
-        if top is None:
-            top = first
-        elif top != first:
-            top = None
-            break
+    if isinstance(entries, ZipBlobs):
+        top = _common_top_folder(entries.paths)
+        if not top:
+            return entries
+        cut = len(top) + 1
+        return replace(entries, paths=[p[cut:] for p in entries.paths])
 
-    if not top:
+    # Translate separators once per key; the top folder check and the
+    # rewrite both work on this list
+    norm = [(_norm_name(k), v) for k, v in entries.items() if isinstance(k, str) and k]
+    if not norm:
         return entries
 
-    # Confirm all keys start with top + "/"
-    prefix = top + "/"
-    if not all(k.replace("\\", "/").startswith(prefix) for k in keys):
+    top = _common_top_folder([k for k, _ in norm])
+    if not top:
         return entries
 
-    new_map: Dict[str, bytes] = {}
-    for k, v in entries.items():
-        kk = k.replace("\\", "/")
-        if kk.startswith(prefix):
-            kk = kk[len(prefix):]
-        new_map[kk] = v
-    return new_map
+    cut = len(top) + 1
+    return {k[cut:]: v for k, v in norm}
 
 
-def as_text_files(entries: Dict[str, bytes], max_bytes: int = 500_000) -> Dict[str, str]:
+def as_text_files(entries: ZipEntries, max_bytes: int = 500_000) -> Dict[str, str]:
     """
     Convert ZIP entries to text files dict[path -> decoded string].
-    Skips very large files and binary-like extensions.
+    Skips very large files and binary-like extensions. For a LazyZip both
+    checks use the central directory, so skipped entries are never inflated.
     """
     if not entries:
         return {}
 
-    binary_exts = {
-        ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".ico",
-        ".exe", ".dll", ".so", ".dylib",
-        ".zip", ".7z", ".rar", ".tar", ".gz",
-        ".pdf", ".docx", ".pptx", ".xlsx",
-        ".pyc", ".class",
-    }
-
-    out: Dict[str, str] = {}
-    for path, data in entries.items():
-        p = (path or "").replace("\\", "/").lstrip("/")
+    paths: List[str] = []
+    handles: List[Any] = []
+    for p, size, handle in _iter_sized(entries):
         if not p or p.endswith("/"):
             continue
 
-        ext = os.path.splitext(p.lower())[1]
-        if ext in binary_exts:
+        if p[-_SUFFIX_TAIL:].lower().endswith(_BINARY_SUFFIXES):
             continue
 
-        if not isinstance(data, (bytes, bytearray)):
+        if size > max_bytes:
             continue
 
-        if len(data) > max_bytes:
-            continue
+        paths.append(p)
+        handles.append(handle)
 
-        try:
-            out[p] = data.decode("utf-8", errors="ignore")
-        except Exception:
+    out: Dict[str, str] = {}
+    for p, data in zip(paths, _materialize_many(entries, handles, max_bytes)):
+        if data is None:
             continue
 
+        # utf_8_decode takes any bytes-like object (memoryview slices too) and
+        # cannot raise with errors="ignore"
+        out[p], _ = utf_8_decode(data, "ignore", False)
+
     return out
 
 
-def extract_binary(entries: Dict[str, bytes], extensions: Optional[Set[str]] = None) -> Dict[str, bytes]:
+def extract_binary(
+    entries: ZipEntries,
+    extensions: Optional[Set[str]] = None,
+    max_bytes: int = _MAX_BINARY_BYTES,
+) -> Dict[str, bytes]:
     """
     Extract binary files by extension (e.g., {'.msapp'}).
+    Entries over `max_bytes` are skipped (by central directory size for a
+    LazyZip, so they are never inflated).
     Returns dict[path -> bytes]
     """
     if not entries:
         return {}
 
-    exts = {e.lower() for e in (extensions or set())}
-    out: Dict[str, bytes] = {}
-
-    for path, data in entries.items():
-        p = (path or "").replace("\\", "/").lstrip("/")
+    exts = tuple({e.lower() for e in (extensions or set())})
+    tail = max(map(len, exts), default=0)
+    # Common case is a single suffix ({".msapp"}): plain str suffix compare
+    match: Union[str, Tuple[str, ...]] = exts[0] if len(exts) == 1 else exts
+    paths: List[str] = []
+    handles: List[Any] = []
+    for p, size, handle in _iter_sized(entries):
         if not p or p.endswith("/"):
             continue
-        ext = os.path.splitext(p.lower())[1]
-        if exts and ext not in exts:
+        if exts and not p[-tail:].lower().endswith(match):
             continue
-        if isinstance(data, (bytes, bytearray)):
+        if size > max_bytes:
+            continue
+        paths.append(p)
+        handles.append(handle)
+
+    out: Dict[str, bytes] = {}
+    for p, data in zip(paths, _materialize_many(entries, handles, max_bytes)):
+        if data is not None:
             out[p] = bytes(data)
 
     return out
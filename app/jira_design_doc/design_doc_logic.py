@@ -11,6 +11,11 @@ from PIL import Image, ImageDraw, ImageFont
 from docx.shared import Inches
 
 
+# Resolved once at import instead of on every diagram render
+FONT_DIR = Path(__file__).resolve().parent / "fonts"
+REG_FONT = FONT_DIR / "DejaVuSans.ttf"
+BOLD_FONT = FONT_DIR / "DejaVuSans-Bold.ttf"
+
 
 def extract_json_from_text(text: str) -> str:
     """
@@ -218,12 +223,6 @@ def create_architecture_diagram_png() -> bytes:
     # ✅ Bigger fonts
     # BIG readable fonts (works on Render if fonts are in repo)
     try:
-        
-
-        FONT_DIR = Path(__file__).resolve().parent / "fonts"
-        REG_FONT = FONT_DIR / "DejaVuSans.ttf"
-        BOLD_FONT = FONT_DIR / "DejaVuSans-Bold.ttf"
-
         if not REG_FONT.exists() or not BOLD_FONT.exists():
             raise FileNotFoundError(
                 f"Fonts not found. Expected:\n{REG_FONT}\n{BOLD_FONT}\n"
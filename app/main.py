@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import importlib
 import importlib.util
+import itertools
+import sys
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+
+from app.templating import templates
 
 
 # ------------------------------------------------------------
@@ -16,6 +19,22 @@ from fastapi.templating import Jinja2Templates
 SUITE_APP_DIR = Path(__file__).resolve().parent          # .../ai-sdlc-suite/app
 REPO_ROOT = SUITE_APP_DIR.parent                         # .../ai-sdlc-suite
 
+# (resolved file, mtime) -> (module name, app): an unchanged file is never
+# re-executed; a changed one replaces its previous module in sys.modules.
+_APP_CACHE: Dict[Tuple[str, float], Tuple[str, Any]] = {}
+_APP_MODULE_VERSIONS: Dict[str, int] = {}
+# Suffix for router-only module names (no clock read, no same-ms collisions)
+_ROUTER_MODULE_COUNTER = itertools.count()
+
+# Directories already on sys.path (set lookup instead of scanning the list)
+_SYSPATH_SEEN = set(sys.path)
+
+
+def _ensure_on_syspath(path: str) -> None:
+    if path not in _SYSPATH_SEEN:
+        sys.path.insert(0, path)
+        _SYSPATH_SEEN.add(path)
+
 
 def _first_existing(candidates: List[Path]) -> Optional[Path]:
     for p in candidates:
@@ -30,11 +49,7 @@ def _import_fastapi_app_from_package(module_path: str):
       app.jira_design_doc.main
     This preserves relative imports inside that module/package.
     """
-    import sys
-
-    repo_root_str = str(REPO_ROOT)
-    if repo_root_str not in sys.path:
-        sys.path.insert(0, repo_root_str)
+    _ensure_on_syspath(str(REPO_ROOT))
 
     mod = importlib.import_module(module_path)
 
@@ -47,28 +62,46 @@ def _import_fastapi_app_from_package(module_path: str):
 def import_fastapi_app_from_file(app_file: Path, module_name: str):
     """
     Loads a Python file as a uniquely-named module and returns its FastAPI `app`.
+    Results are cached by (path, mtime), so an unchanged file is loaded once.
     NOTE: This does NOT support relative imports like 'from .x import y'
     unless the module is loaded as a package. Use package import when possible.
     """
-    import sys
-    import time
+    resolved = app_file.resolve()
+    key = (str(resolved), resolved.stat().st_mtime)
+    cached = _APP_CACHE.get(key)
+    if cached is not None:
+        return cached[1]
 
-    app_dir = str(app_file.parent)
-    if app_dir not in sys.path:
-        sys.path.insert(0, app_dir)
+    _ensure_on_syspath(str(app_file.parent))
 
-    unique_name = f"{module_name}_{int(time.time() * 1000)}"
+    # Stable name; bumped only when the same module key is loaded again
+    version = _APP_MODULE_VERSIONS.get(module_name, 0) + 1
+    unique_name = module_name if version == 1 else f"{module_name}_{version}"
 
     spec = importlib.util.spec_from_file_location(unique_name, str(app_file))
     if spec is None or spec.loader is None:
         raise RuntimeError(f"Could not load module spec for: {app_file}")
 
     mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)  # type: ignore
+    sys.modules[unique_name] = mod
+    try:
+        spec.loader.exec_module(mod)  # type: ignore
+    except BaseException:
+        sys.modules.pop(unique_name, None)
+        raise
 
     if not hasattr(mod, "app"):
+        sys.modules.pop(unique_name, None)
         raise AttributeError(f"{app_file} does not define a FastAPI variable named 'app'")
 
+    # Drop the previous version of this file so old modules don't pile up
+    for old_key in [k for k in _APP_CACHE if k[0] == key[0]]:
+        old_name, _ = _APP_CACHE.pop(old_key)
+        if old_name != unique_name:
+            sys.modules.pop(old_name, None)
+
+    _APP_MODULE_VERSIONS[module_name] = version
+    _APP_CACHE[key] = (unique_name, mod.app)
     return mod.app
 
 
@@ -147,14 +180,9 @@ def load_router_only_app(
         return stub_app(display_name, expected)
 
     try:
-        import sys
-        import time
-
-        app_dir = str(router_file.parent)
-        if app_dir not in sys.path:
-            sys.path.insert(0, app_dir)
+        _ensure_on_syspath(str(router_file.parent))
 
-        unique_name = f"{module_key}_router_{int(time.time() * 1000)}"
+        unique_name = f"{module_key}_router_{next(_ROUTER_MODULE_COUNTER)}"
         spec = importlib.util.spec_from_file_location(unique_name, str(router_file))
         if spec is None or spec.loader is None:
             raise RuntimeError(f"Could not load module spec for: {router_file}")
@@ -179,7 +207,8 @@ def load_router_only_app(
 # Suite app
 # ------------------------------------------------------------
 suite = FastAPI(title="AI SDLC Suite")
-templates = Jinja2Templates(directory=str(SUITE_APP_DIR / "templates"))
+# Parse/compile at import so the first "/" request doesn't pay for it
+_INDEX_TMPL = templates.get_template("index.html")
 
 
 # ✅ Render-safe health endpoints (GET + HEAD)
@@ -201,7 +230,7 @@ def head_root():
 
 @suite.get("/", response_class=HTMLResponse)
 def home(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(_INDEX_TMPL.render(request=request))
 
 
 # ------------------------------------------------------------
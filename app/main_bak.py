@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import importlib
 import importlib.util
+import itertools
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Any, Callable, Dict, Optional, List, Tuple
 
 from fastapi import FastAPI, Request, Response
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+
+from app.templating import templates
 
 
 # ------------------------------------------------------------
@@ -16,6 +18,10 @@ from fastapi.templating import Jinja2Templates
 SUITE_APP_DIR = Path(__file__).resolve().parent          # .../ai-sdlc-suite/app
 REPO_ROOT = SUITE_APP_DIR.parent                         # .../ai-sdlc-suite
 
+# app file -> loaded module; each file is executed once per process
+_file_cache: Dict[str, Any] = {}
+_loader_counter = itertools.count()
+
 
 def _first_existing(candidates: List[Path]) -> Optional[Path]:
     for p in candidates:
@@ -52,13 +58,16 @@ def import_fastapi_app_from_file(app_file: Path, module_name: str):
     unless the module is loaded as a package. Use package import when possible.
     """
     import sys
-    import time
+
+    cached = _file_cache.get(str(app_file))
+    if cached is not None:
+        return cached.app
 
     app_dir = str(app_file.parent)
     if app_dir not in sys.path:
         sys.path.insert(0, app_dir)
 
-    unique_name = f"{module_name}_{int(time.time() * 1000)}"
+    unique_name = f"{module_name}_{next(_loader_counter)}"
 
     spec = importlib.util.spec_from_file_location(unique_name, str(app_file))
     if spec is None or spec.loader is None:
@@ -70,6 +79,7 @@ def import_fastapi_app_from_file(app_file: Path, module_name: str):
     if not hasattr(mod, "app"):
         raise AttributeError(f"{app_file} does not define a FastAPI variable named 'app'")
 
+    _file_cache[str(app_file)] = mod
     return mod.app
 
 
@@ -133,11 +143,27 @@ def load_module_app(
         return stub_app(display_name, f"{app_file}\n\nImport error:\n{e}")
 
 
+class LazyASGI:
+    """
+    ASGI app that builds the wrapped app on its first request, so a sub-app's
+    heavy imports (docx, PyPDF2, LLM SDKs) stay off the startup path.
+    """
+
+    def __init__(self, loader: Callable[[], Any]) -> None:
+        self._loader = loader
+        self._app: Any = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self._app is None:
+            # no await between the check and the assignment: loads once
+            self._app = self._loader()
+        await self._app(scope, receive, send)
+
+
 # ------------------------------------------------------------
 # Suite app
 # ------------------------------------------------------------
 suite = FastAPI(title="AI SDLC Suite")
-templates = Jinja2Templates(directory=str(SUITE_APP_DIR / "templates"))
 
 
 # ✅ Render-safe health endpoints (GET + HEAD)
@@ -161,11 +187,11 @@ def home(request: Request):
 
 
 # ------------------------------------------------------------
-# Load sibling apps safely
+# Load sibling apps safely (on first request to their mount)
 # ------------------------------------------------------------
 
 # ✅ FIXED: load as package so relative imports work (NO logic changes in module)
-user_story_app = load_module_app(
+user_story_app = LazyASGI(lambda: load_module_app(
     "User Story Generator",
     "jira_user_story",
     candidates=[
@@ -179,10 +205,10 @@ user_story_app = load_module_app(
         REPO_ROOT / "app" / "jira_user_story" / "app.py",
     ],
     package_import="app.jira_user_story.main",
-)
+))
 
 # ✅ FIXED: load as package so relative imports work (NO logic changes in module)
-design_doc_app = load_module_app(
+design_doc_app = LazyASGI(lambda: load_module_app(
     "Design Doc Generator",
     "jira_design_doc",
     candidates=[
@@ -196,7 +222,7 @@ design_doc_app = load_module_app(
         REPO_ROOT / "app" / "jira_design_doc" / "app.py",
     ],
     package_import="app.jira_design_doc.main",
-)
+))
 
 # ✅ DO NOT CHANGE: option 3 (kept same approach)
 #code_review_app = load_module_app(
@@ -212,7 +238,7 @@ design_doc_app = load_module_app(
 #)
 
 # ✅ DO NOT CHANGE: option 4 (kept same approach)
-ai_code_review_app = load_module_app(
+ai_code_review_app = LazyASGI(lambda: load_module_app(
     "AI Code Review",
     "ai_code_review",
     candidates=[
@@ -220,7 +246,7 @@ ai_code_review_app = load_module_app(
         REPO_ROOT / "ai-code-review" / "main.py",
         REPO_ROOT / "ai_code_review" / "main.py",
     ],
-)
+))
 
 
 # ------------------------------------------------------------
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import itertools
 import re
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
 
 @dataclass
@@ -17,55 +18,105 @@ class PromptOptions:
     max_nfrs: int = 12
 
 
+# --------------------------
+# Patterns (compiled once; used per line)
+# --------------------------
+_SPACES_RE = re.compile(r"\s+")
+# Captures the bullet payload, so a hit needs no second pass to strip it
+_BULLET_RE = re.compile(r"^(?:[-*•]|\d+[.)])\s+(.*)")
+_USER_STORY_RE = re.compile(r"^as a\s+.+\s+i want\s+.+")
+_ROLE_RE = re.compile(r"\b(as a|role:)\s+([A-Za-z0-9 \-/&_]+)", re.I)
+_TRAIL_PUNCT_RE = re.compile(r"[.,;:]+$")
+_REQ_KEYWORDS = ("must", "shall", "should", "required", "need to", "needs to")
+
+# Category keywords are substrings ("integrat", "scal"); a keyword can feed
+# more than one category ("audit", "integrat", "retention").
+_CAPABILITY_KW = ["create", "update", "delete", "view", "submit", "approve", "reject",
+                  "upload", "download", "notify", "dashboard", "report", "audit",
+                  "track", "search", "assign", "escalat", "remind", "integrat"]
+_CONSTRAINT_KW = ["integrat", "api", "connector", "sso", "entra", "azure ad",
+                  "sharepoint", "email", "teams", "retention", "compliance",
+                  "dataverse", "dynamics", "erp", "crm"]
+_NFR_KW = ["performance", "scal", "availability", "uptime",
+           "security", "encryption", "audit", "logging",
+           "privacy", "gdpr", "retention", "backup", "monitor"]
+
+_KW_CATEGORIES: Dict[str, Set[str]] = {}
+for _cat, _kws in (("capability", _CAPABILITY_KW), ("constraint", _CONSTRAINT_KW), ("nfr", _NFR_KW)):
+    for _kw in _kws:
+        _KW_CATEGORIES.setdefault(_kw, set()).add(_cat)
+
+# All keywords in one alternation; the lookahead reports a match at every
+# position, so overlapping keywords ("escalat" / "scal") are all seen.
+_ALL_KW_RE = re.compile("(?=(" + "|".join(map(re.escape, _KW_CATEGORIES)) + "))")
+
+
 # --------------------------
 # Helpers
 # --------------------------
 def _clean(s: str) -> str:
-    s = (s or "").replace("\x00", " ").strip()
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)
-    return s.strip()
+    if not s:
+        return ""
+    s = s.replace("\x00", " ")
+    # One pass per line instead of two regex sweeps over the whole text:
+    # collapse whitespace runs, and keep at most one blank line in a row
+    out = []
+    out_append = out.append
+    blank = 0
+    for ln in s.splitlines():
+        ln = " ".join(ln.split())
+        if ln:
+            out_append(ln)
+            blank = 0
+        else:
+            blank += 1
+            if blank == 1:
+                out_append("")
+    return "\n".join(out).strip()
 
 
 def _dedupe_keep_order(items: List[str]) -> List[str]:
-    seen = set()
-    out = []
+    # case-insensitive key -> first-seen spelling; dicts keep insertion order
+    seen: Dict[str, str] = {}
+    keep_first = seen.setdefault
     for it in items:
-        key = it.lower().strip()
-        if not key or key in seen:
-            continue
-        seen.add(key)
-        out.append(it.strip())
-    return out
+        s = it.strip()
+        if s:
+            keep_first(s.lower(), s)
+    return list(seen.values())
 
 
 def _extract_bullets(text: str) -> List[str]:
     """
     Extract bullet-like lines and requirement-y statements.
+    `text` must already be _clean()ed.
     """
-    lines = [ln.strip() for ln in _clean(text).splitlines() if ln.strip()]
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
     bullets: List[str] = []
+    out_append = bullets.append  # hot loop: skip the per-line method lookup
 
     for ln in lines:
         # obvious bullets
-        if re.match(r"^(\-|\*|•|\d+\)|\d+\.)\s+", ln):
-            bullets.append(re.sub(r"^(\-|\*|•|\d+\)|\d+\.)\s+", "", ln).strip())
+        m = _BULLET_RE.match(ln)
+        if m:
+            out_append(m.group(1).strip())
             continue
 
-        # AC style
         low = ln.lower()
+
+        # AC style
         if "given" in low and "when" in low and "then" in low:
-            bullets.append(ln)
+            out_append(ln)
             continue
 
         # "As a ... I want ... so that ..."
-        if re.match(r"^as a\s+.+\s+i want\s+.+", low):
-            bullets.append(ln)
+        if _USER_STORY_RE.match(low):
+            out_append(ln)
             continue
 
         # short requirement sentences (heuristic)
-        if any(k in low for k in ["must", "shall", "should", "required", "need to", "needs to"]):
-            bullets.append(ln)
+        if any(k in low for k in _REQ_KEYWORDS):
+            out_append(ln)
             continue
 
     return _dedupe_keep_order(bullets)
@@ -79,64 +130,59 @@ def _pick_sections(design: str, jira: str):
     - capabilities
     - constraints/integrations
     - NFRs
+    `design` and `jira` must already be _clean()ed (the caller does it once).
     """
-    all_text = _clean(design + "\n\n" + jira)
-    bullets = _extract_bullets(all_text)
+    # Scan each document on its own (no design + jira concatenation)
+    bullets = _dedupe_keep_order(_extract_bullets(design) + _extract_bullets(jira))
+    # Split each document once; the passes below reuse these lists
+    design_lines = design.splitlines()
+    jira_lines = jira.splitlines()
 
     # Personas / roles (heuristics)
     personas = []
+    personas_append = personas.append
     for b in bullets:
-        m = re.search(r"\b(as a|role:)\s+([A-Za-z0-9 \-/&_]+)", b, re.I)
+        m = _ROLE_RE.search(b)
         if m:
             role = m.group(2).strip()
-            role = re.sub(r"[.,;:]+$", "", role)
+            role = _TRAIL_PUNCT_RE.sub("", role)
             if 2 <= len(role) <= 60:
-                personas.append(role)
+                personas_append(role)
 
     # Also extract from “Audience / Users / Roles”
-    for ln in all_text.splitlines():
+    for ln in itertools.chain(design_lines, jira_lines):
         low = ln.lower().strip()
         if any(h in low for h in ["audience", "user roles", "roles", "personas"]):
             # next lines often contain roles; keep lightweight by adding the heading line
-            personas.append(re.sub(r"\s+", " ", ln.strip()))
+            personas_append(_SPACES_RE.sub(" ", ln.strip()))
 
     personas = _dedupe_keep_order(personas)
 
-    # Capabilities (prefer functional requirements + AC + user stories)
+    # Capabilities (prefer functional requirements + AC + user stories),
+    # constraints / integrations / platforms, and NFRs: one pass over bullets
     capabilities = []
+    constraints = []
+    nfrs = []
+    cap_append = capabilities.append
+    con_append = constraints.append
+    nfr_append = nfrs.append
     for b in bullets:
-        low = b.lower()
-        if any(k in low for k in ["create", "update", "delete", "view", "submit", "approve", "reject",
-                                  "upload", "download", "notify", "dashboard", "report", "audit",
-                                  "track", "search", "assign", "escalat", "remind", "integrat"]):
-            capabilities.append(b)
+        cats = {c for kw in _ALL_KW_RE.findall(b.lower()) for c in _KW_CATEGORIES[kw]}
+        if "capability" in cats:
+            cap_append(b)
+        if "constraint" in cats:
+            con_append(b)
+        if "nfr" in cats:
+            nfr_append(b)
 
     capabilities = _dedupe_keep_order(capabilities)
-
-    # Constraints / integrations / platforms
-    constraints = []
-    for b in bullets:
-        low = b.lower()
-        if any(k in low for k in ["integrat", "api", "connector", "sso", "entra", "azure ad",
-                                  "sharepoint", "email", "teams", "retention", "compliance",
-                                  "dataverse", "dynamics", "erp", "crm"]):
-            constraints.append(b)
     constraints = _dedupe_keep_order(constraints)
-
-    # NFRs
-    nfrs = []
-    for b in bullets:
-        low = b.lower()
-        if any(k in low for k in ["performance", "scal", "availability", "uptime",
-                                  "security", "encryption", "audit", "logging",
-                                  "privacy", "gdpr", "retention", "backup", "monitor"]):
-            nfrs.append(b)
     nfrs = _dedupe_keep_order(nfrs)
 
     # Context summary: take first few meaningful sentences from design overview-ish content
     # Keep it short and not a raw paste.
     summary_lines = []
-    for ln in _clean(design).splitlines():
+    for ln in design_lines:
         if len(ln.strip()) < 4:
             continue
         # Prefer overview / scope / summary style lines
@@ -146,7 +192,7 @@ def _pick_sections(design: str, jira: str):
             break
     if not summary_lines:
         # fallback: first 3 non-empty lines
-        for ln in _clean(design).splitlines()[:6]:
+        for ln in design_lines[:6]:
             if ln.strip():
                 summary_lines.append(ln.strip())
             if len(summary_lines) >= 3:
@@ -165,22 +211,8 @@ def _fmt_list(title: str, items: List[str], limit: int) -> str:
     return title + "\n" + "\n".join([f"- {it}" for it in items])
 
 
-def build_copilot_make_a_plan_prompt(
-    design_doc_text: str,
-    jira_stories_text: str,
-    options: Optional[PromptOptions] = None,
-) -> str:
-    """
-    Domain-agnostic "classic" Make-a-Plan prompt generator.
-    It DOES NOT dump the full document; it extracts high-signal bullets and structures them.
-    """
-    opts = options or PromptOptions()
-    design = _clean(design_doc_text)
-    jira = _clean(jira_stories_text)
-
-    context_summary, personas, capabilities, constraints, nfrs = _pick_sections(design, jira)
-
-    prompt = f"""
+# Prompt skeleton, filled once per call with str.format_map (no literal braces)
+_PROMPT_TMPL = """
 ROLE
 You are Microsoft Power Platform Copilot in “Make a plan” mode.
 Act as an enterprise Power Platform Solution Architect + Lead Developer.
@@ -189,23 +221,23 @@ GOAL
 Create a complete Power Platform solution based on the requirements below.
 
 SOLUTION STANDARDS
-- Solution Name: {opts.solution_name}
-- Publisher Prefix: {opts.publisher_prefix}
+- Solution Name: {solution_name}
+- Publisher Prefix: {publisher_prefix}
 - Dataverse-first unless explicitly stated otherwise
 - ALM ready (Dev/Test/Prod): Environment Variables + Connection References
 - Security: least privilege, role-based access, row-level security where needed
 - Quality: error handling, logging, auditability, performance-friendly schema
 
 DOMAIN CONTEXT (AUTO-SUMMARIZED)
-{_fmt_list("", context_summary, opts.max_bullets).replace("\\n- ", "\\n- ").strip()}
+{domain_context}
 
-{_fmt_list("PERSONAS / ROLES (AUTO-EXTRACTED)", personas, opts.max_roles)}
+{personas}
 
-{_fmt_list("KEY CAPABILITIES (AUTO-EXTRACTED)", capabilities, opts.max_capabilities)}
+{capabilities}
 
-{_fmt_list("CONSTRAINTS / INTEGRATIONS (AUTO-EXTRACTED)", constraints, opts.max_constraints)}
+{constraints}
 
-{_fmt_list("NON-FUNCTIONAL REQUIREMENTS (AUTO-EXTRACTED)", nfrs, opts.max_nfrs)}
+{nfrs}
 
 WHAT TO BUILD (OUTPUT REQUIRED)
 1) Output a “MAKE A PLAN” broken into phases with numbered tasks.
@@ -248,6 +280,32 @@ NOW START:
 Output the “MAKE A PLAN” first, then the detailed build blueprint.
 """.strip()
 
+
+def build_copilot_make_a_plan_prompt(
+    design_doc_text: str,
+    jira_stories_text: str,
+    options: Optional[PromptOptions] = None,
+) -> str:
+    """
+    Domain-agnostic "classic" Make-a-Plan prompt generator.
+    It DOES NOT dump the full document; it extracts high-signal bullets and structures them.
+    """
+    opts = options or PromptOptions()
+    design = _clean(design_doc_text)
+    jira = _clean(jira_stories_text)
+
+    context_summary, personas, capabilities, constraints, nfrs = _pick_sections(design, jira)
+
+    prompt = _PROMPT_TMPL.format_map({
+        "solution_name": opts.solution_name,
+        "publisher_prefix": opts.publisher_prefix,
+        "domain_context": _fmt_list("", context_summary, opts.max_bullets).strip(),
+        "personas": _fmt_list("PERSONAS / ROLES (AUTO-EXTRACTED)", personas, opts.max_roles),
+        "capabilities": _fmt_list("KEY CAPABILITIES (AUTO-EXTRACTED)", capabilities, opts.max_capabilities),
+        "constraints": _fmt_list("CONSTRAINTS / INTEGRATIONS (AUTO-EXTRACTED)", constraints, opts.max_constraints),
+        "nfrs": _fmt_list("NON-FUNCTIONAL REQUIREMENTS (AUTO-EXTRACTED)", nfrs, opts.max_nfrs),
+    })
+
     # final safe cap
     if len(prompt) > opts.max_chars:
         prompt = prompt[:opts.max_chars].rsplit("\n", 1)[0].strip()
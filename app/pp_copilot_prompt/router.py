@@ -1,26 +1,62 @@
 from __future__ import annotations
 
+import hashlib
+import os
+from typing import Any, BinaryIO, Dict, Tuple
+
 from fastapi import APIRouter, File, Form, UploadFile
 from fastapi.responses import JSONResponse
 
+try:
+    import orjson  # noqa: F401  (ORJSONResponse needs it at render time)
+    from fastapi.responses import ORJSONResponse as _FastJSONResponse
+except ImportError:  # stdlib json fallback
+    _FastJSONResponse = JSONResponse
+
 from .text_extractors import extract_text_from_upload
 from .prompt_builder import PromptOptions, build_copilot_make_a_plan_prompt
 
 router = APIRouter(prefix="/pp-copilot", tags=["pp-copilot"])
 
+# Finished responses keyed by upload digests + options; a retry or refresh
+# with the same files skips extraction and prompt building entirely.
+_PROMPT_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+_PROMPT_CACHE_MAX = 32
+_HASH_CHUNK = 1 << 20
+
 
-@router.post("/generate")
+def _file_digest(fp: BinaryIO) -> bytes:
+    # Hash the spooled upload in chunks so it is never read whole into memory
+    fp.seek(0)
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in iter(lambda: fp.read(_HASH_CHUNK), b""):
+        h.update(chunk)
+    fp.seek(0)
+    return h.digest()
+
+
+@router.post("/generate", response_class=_FastJSONResponse)
 async def generate_copilot_prompt(
     design_doc: UploadFile = File(...),
     jira_stories: UploadFile = File(...),
     solution_name: str = Form("MSPP Auto-Generated Solution"),
     publisher_prefix: str = Form("org"),
 ):
-    design_bytes = await design_doc.read()
-    jira_bytes = await jira_stories.read()
+    key = (
+        _file_digest(design_doc.file),
+        _file_digest(jira_stories.file),
+        solution_name,
+        publisher_prefix,
+        os.path.splitext(design_doc.filename or "")[1].lower(),
+        os.path.splitext(jira_stories.filename or "")[1].lower(),
+    )
+    cached = _PROMPT_CACHE.get(key)
+    if cached is not None:
+        return dict(cached)
 
-    design = extract_text_from_upload(design_doc.filename, design_bytes)
-    jira = extract_text_from_upload(jira_stories.filename, jira_bytes)
+    # The extractor parses the spooled uploads in place
+    design = extract_text_from_upload(design_doc.filename, design_doc.file)
+    jira = extract_text_from_upload(jira_stories.filename, jira_stories.file)
 
     if not design.text:
         return JSONResponse(
@@ -36,10 +72,15 @@ async def generate_copilot_prompt(
     opts = PromptOptions(solution_name=solution_name, publisher_prefix=publisher_prefix)
     prompt = build_copilot_make_a_plan_prompt(design.text, jira.text, opts)
 
-    return {
+    result = {
         "solution_name": solution_name,
         "publisher_prefix": publisher_prefix,
         "design_doc_type": design.detected_type,
         "jira_doc_type": jira.detected_type,
         "prompt": prompt,
     }
+
+    if len(_PROMPT_CACHE) >= _PROMPT_CACHE_MAX:
+        _PROMPT_CACHE.pop(next(iter(_PROMPT_CACHE)))  # drop oldest
+    _PROMPT_CACHE[key] = result
+    return dict(result)
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
+import io
 import os
-import re
 import shutil
 import subprocess
 import tempfile
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import BinaryIO, Optional, Tuple, Union
 
-from docx import Document  # python-docx
-from PyPDF2 import PdfReader
+# python-docx and the PDF libraries are imported inside their readers: an
+# upload only ever needs one of them.
 
 
 @dataclass
@@ -19,33 +20,83 @@ class ExtractedText:
     detected_type: str
 
 
+# A filesystem path or a seekable binary file object; python-docx, pypdfium2
+# and PyPDF2 all accept either.
+_Source = Union[str, BinaryIO]
+
+
 def _clean_text(s: str) -> str:
     if not s:
         return ""
     s = s.replace("\x00", " ")
-    s = re.sub(r"[ \t]+", " ", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)
-    return s.strip()
+    # One pass per line instead of two regex sweeps over the whole text:
+    # collapse whitespace runs, and keep at most one blank line in a row
+    out = []
+    blank = 0
+    for ln in s.splitlines():
+        ln = " ".join(ln.split())
+        if ln:
+            out.append(ln)
+            blank = 0
+        else:
+            blank += 1
+            if blank == 1:
+                out.append("")
+    return "\n".join(out).strip()
+
+
+def _read_docx(path: _Source) -> str:
+    from docx import Document  # python-docx
 
-
-def _read_docx(path: str) -> str:
     doc = Document(path)
     parts = []
     for p in doc.paragraphs:
         t = (p.text or "").strip()
         if t:
             parts.append(t)
-    # Tables (often important in design docs)
+    # Tables (often important in design docs); rows with no text are skipped
+    rows_out = []
     for table in doc.tables:
         for row in table.rows:
-            row_text = " | ".join((cell.text or "").strip() for cell in row.cells)
-            row_text = row_text.strip()
-            if row_text and row_text != "|":
-                parts.append(row_text)
+            cells = [(cell.text or "").strip() for cell in row.cells]
+            if any(cells):
+                rows_out.append(" | ".join(cells))
+    parts.extend(rows_out)
     return _clean_text("\n".join(parts))
 
 
-def _read_pdf(path: str) -> str:
+def _read_pdf(path: _Source) -> str:
+    try:
+        import pypdfium2 as pdfium  # optional: PDFium (C++) text extraction, much faster
+    except ImportError:
+        return _read_pdf_pypdf2(path)
+
+    pdf = pdfium.PdfDocument(path)
+    parts = []
+    try:
+        for page in pdf:
+            try:
+                textpage = page.get_textpage()
+                try:
+                    txt = textpage.get_text_range() or ""
+                finally:
+                    textpage.close()
+            except Exception:
+                txt = ""
+            finally:
+                page.close()
+            # PDFium separates lines with CRLF
+            txt = txt.replace("\r\n", "\n").strip()
+            if txt:
+                parts.append(txt)
+    finally:
+        pdf.close()
+    return _clean_text("\n\n".join(parts))
+
+
+def _read_pdf_pypdf2(path: _Source) -> str:
+    from PyPDF2 import PdfReader
+
     reader = PdfReader(path)
     parts = []
     for page in reader.pages:
@@ -59,9 +110,12 @@ def _read_pdf(path: str) -> str:
     return _clean_text("\n\n".join(parts))
 
 
-def _read_txt(path: str) -> str:
-    with open(path, "rb") as f:
-        raw = f.read()
+def _read_txt(path: _Source) -> str:
+    if isinstance(path, str):
+        with open(path, "rb") as f:
+            raw = f.read()
+    else:
+        raw = path.read()
     # Try utf-8 first, fallback to latin-1
     try:
         text = raw.decode("utf-8")
@@ -70,12 +124,18 @@ def _read_txt(path: str) -> str:
     return _clean_text(text)
 
 
+@lru_cache(maxsize=1)
+def _soffice_bin() -> Optional[str]:
+    # PATH walk once per process, not once per .doc upload
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
 def _soffice_convert_to_docx(input_path: str, out_dir: str) -> Optional[str]:
     """
     Converts legacy .doc to .docx using LibreOffice headless (soffice).
     Returns the converted .docx path if successful.
     """
-    soffice = shutil.which("soffice") or shutil.which("libreoffice")
+    soffice = _soffice_bin()
     if not soffice:
         return None
 
@@ -104,32 +164,44 @@ def _soffice_convert_to_docx(input_path: str, out_dir: str) -> Optional[str]:
     return converted if os.path.exists(converted) else None
 
 
+_COPY_CHUNK = 1 << 20
+
+
 def extract_text_from_upload(
     filename: str,
-    file_bytes: bytes,
+    source: Union[bytes, BinaryIO],
 ) -> ExtractedText:
     """
     Supports: .docx, .doc, .pdf, .txt, .md
     For .doc, attempts soffice conversion -> docx.
+    `source` is the file content, or a file object (e.g. UploadFile.file).
+    Only .doc goes through a temp file; the other types are parsed in memory.
     """
     ext = (os.path.splitext(filename)[1] or "").lower().strip(".")
     detected = ext or "unknown"
 
-    with tempfile.TemporaryDirectory() as td:
-        in_path = os.path.join(td, filename)
-        with open(in_path, "wb") as f:
-            f.write(file_bytes)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        fileobj: BinaryIO = io.BytesIO(source)
+    else:
+        fileobj = source
+        fileobj.seek(0)
+
+    if ext in ("docx",):
+        return ExtractedText(filename, _read_docx(fileobj), "docx")
 
-        if ext in ("docx",):
-            return ExtractedText(filename, _read_docx(in_path), "docx")
+    if ext in ("pdf",):
+        return ExtractedText(filename, _read_pdf(fileobj), "pdf")
 
-        if ext in ("pdf",):
-            return ExtractedText(filename, _read_pdf(in_path), "pdf")
+    if ext in ("txt", "md"):
+        return ExtractedText(filename, _read_txt(fileobj), "text")
 
-        if ext in ("txt", "md"):
-            return ExtractedText(filename, _read_txt(in_path), "text")
+    if ext in ("doc",):
+        # LibreOffice needs a real file to convert
+        with tempfile.TemporaryDirectory() as td:
+            in_path = os.path.join(td, filename)
+            with open(in_path, "wb") as f:
+                shutil.copyfileobj(fileobj, f, length=_COPY_CHUNK)
 
-        if ext in ("doc",):
             converted = _soffice_convert_to_docx(in_path, td)
             if not converted:
                 # best-effort: return empty with guidance
@@ -140,5 +212,5 @@ def extract_text_from_upload(
                 )
             return ExtractedText(filename, _read_docx(converted), "doc->docx")
 
-        # Unknown type
-        return ExtractedText(filename, "", f"unsupported:{detected}")
+    # Unknown type
+    return ExtractedText(filename, "", f"unsupported:{detected}")
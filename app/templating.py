@@ -0,0 +1,31 @@
+import os
+from pathlib import Path
+
+import jinja2
+from fastapi.templating import Jinja2Templates
+
+
+# Always resolve templates relative to this file (app/templates)
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+# Environment:
+#   JINJA_CACHE_DIR    compiled-template cache (default: $AISDLC_CACHE_DIR/jinja,
+#                      i.e. ~/.cache/ai-sdlc/jinja, shared with the code-review caches)
+#   JINJA_AUTO_RELOAD  "0" skips the per-render template mtime check; set it in
+#                      deployed images where templates never change (default "1")
+AISDLC_CACHE_DIR = os.path.expanduser(os.getenv("AISDLC_CACHE_DIR", "~/.cache/ai-sdlc"))
+JINJA_CACHE_DIR = os.getenv("JINJA_CACHE_DIR", os.path.join(AISDLC_CACHE_DIR, "jinja"))
+JINJA_AUTO_RELOAD = os.getenv("JINJA_AUTO_RELOAD", "1") != "0"
+
+# One shared Environment for the suite-level pages: each template is compiled
+# once per process, and the bytecode cache lets new workers skip compiling.
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+try:
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    templates.env.bytecode_cache = jinja2.FileSystemBytecodeCache(JINJA_CACHE_DIR)
+except OSError:
+    # read-only filesystem: in-process template cache only
+    pass
+
+templates.env.auto_reload = JINJA_AUTO_RELOAD
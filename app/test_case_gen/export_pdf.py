@@ -1,12 +1,30 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, List, Union
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 
+from app.test_case_gen.export_prep import story_refs_csv
+
+# Styles are only read while a document builds, so they are set up once per
+# process instead of once per export
+_STYLES = getSampleStyleSheet()
+_TITLE = ParagraphStyle("title", parent=_STYLES["Heading1"], spaceAfter=10)
+_H2 = ParagraphStyle("h2", parent=_STYLES["Heading2"], spaceAfter=6)
+_H3 = _STYLES["Heading3"]
+_NORMAL = _STYLES["BodyText"]
+_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#111827")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
+])
+
 
 def _p(text: str, style) -> Paragraph:
     return Paragraph((text or "").replace("\n", "<br/>"), style)
@@ -15,15 +33,50 @@ def _p(text: str, style) -> Paragraph:
 def _bullets(items: List[str], style) -> Paragraph:
     if not items:
         return Paragraph("-", style)
-    html = "<br/>".join([f"• {i}" for i in items if (i or "").strip()])
+    html = "<br/>".join(f"• {i}" for i in items if (i or "").strip())
     return Paragraph(html, style)
 
 
-def write_testcases_pdf(payload: Dict[str, Any], out_path: str) -> None:
-    styles = getSampleStyleSheet()
-    title = ParagraphStyle("title", parent=styles["Heading1"], spaceAfter=10)
-    h2 = ParagraphStyle("h2", parent=styles["Heading2"], spaceAfter=6)
-    normal = styles["BodyText"]
+def _build_tc_flowables(tc: Dict[str, Any], normal, h3) -> List[Any]:
+    """Flowables for one test case in the detailed section."""
+    out: List[Any] = [
+        _p(f"{tc.get('id','')} — {tc.get('title','')}", h3),
+        _p(f"<b>Category:</b> {tc.get('category','')} &nbsp;&nbsp; <b>Priority:</b> {tc.get('priority','')}", normal),
+        _p(f"<b>Story Refs:</b> {story_refs_csv(tc)}", normal),
+        Spacer(1, 6),
+    ]
+    for heading, key in (
+        ("Preconditions", "preconditions"),
+        ("Test Data", "test_data"),
+        ("Steps", "steps"),
+        ("Expected Results", "expected_results"),
+    ):
+        out += (_p(f"<b>{heading}</b>", normal), _bullets(tc.get(key, []) or [], normal), Spacer(1, 6))
+
+    gherkins = tc.get("gherkin", []) or []
+    if gherkins:
+        out.append(_p("<b>Gherkin</b>", normal))
+        for g in gherkins:
+            out += (
+                _p(f"<b>Feature:</b> {g.get('feature','')}", normal),
+                _p(f"<b>Scenario:</b> {g.get('scenario','')}", normal),
+                _p("<b>Given</b>", normal), _bullets(g.get("given", []) or [], normal),
+                _p("<b>When</b>", normal), _bullets(g.get("when", []) or [], normal),
+                _p("<b>Then</b>", normal), _bullets(g.get("then", []) or [], normal),
+                Spacer(1, 8),
+            )
+
+    notes = tc.get("notes", []) or []
+    if notes:
+        out += (_p("<b>Notes</b>", normal), _bullets(notes, normal))
+
+    out.append(Spacer(1, 12))
+    return out
+
+
+def write_testcases_pdf(payload: Dict[str, Any], out_path: Union[str, IO[bytes]]) -> None:
+    """`out_path` is a file path or a writable binary file object."""
+    title, h2, h3, normal = _TITLE, _H2, _H3, _NORMAL
 
     doc = SimpleDocTemplate(out_path, pagesize=A4, rightMargin=36, leftMargin=36, topMargin=36, bottomMargin=36)
     story: List[Any] = []
@@ -52,18 +105,11 @@ def write_testcases_pdf(payload: Dict[str, Any], out_path: str) -> None:
             tc.get("category", ""),
             tc.get("priority", ""),
             tc.get("title", ""),
-            ", ".join(tc.get("story_refs", []) or []),
+            story_refs_csv(tc),
         ])
 
     tbl = Table(rows, colWidths=[55, 80, 60, 220, 80])
-    tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#111827")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
-    ]))
+    tbl.setStyle(_TABLE_STYLE)
     story.append(tbl)
     story.append(PageBreak())
 
@@ -72,43 +118,6 @@ def write_testcases_pdf(payload: Dict[str, Any], out_path: str) -> None:
     story.append(Spacer(1, 6))
 
     for tc in payload.get("test_cases", []):
-        story.append(_p(f"{tc.get('id','')} — {tc.get('title','')}", styles["Heading3"]))
-        story.append(_p(f"<b>Category:</b> {tc.get('category','')} &nbsp;&nbsp; <b>Priority:</b> {tc.get('priority','')}", normal))
-        story.append(_p(f"<b>Story Refs:</b> {', '.join(tc.get('story_refs', []) or [])}", normal))
-        story.append(Spacer(1, 6))
-
-        story.append(_p("<b>Preconditions</b>", normal))
-        story.append(_bullets(tc.get("preconditions", []) or [], normal))
-        story.append(Spacer(1, 6))
-
-        story.append(_p("<b>Test Data</b>", normal))
-        story.append(_bullets(tc.get("test_data", []) or [], normal))
-        story.append(Spacer(1, 6))
-
-        story.append(_p("<b>Steps</b>", normal))
-        story.append(_bullets(tc.get("steps", []) or [], normal))
-        story.append(Spacer(1, 6))
-
-        story.append(_p("<b>Expected Results</b>", normal))
-        story.append(_bullets(tc.get("expected_results", []) or [], normal))
-        story.append(Spacer(1, 6))
-
-        gherkins = tc.get("gherkin", []) or []
-        if gherkins:
-            story.append(_p("<b>Gherkin</b>", normal))
-            for g in gherkins:
-                story.append(_p(f"<b>Feature:</b> {g.get('feature','')}", normal))
-                story.append(_p(f"<b>Scenario:</b> {g.get('scenario','')}", normal))
-                story.append(_p("<b>Given</b>", normal)); story.append(_bullets(g.get("given", []) or [], normal))
-                story.append(_p("<b>When</b>", normal)); story.append(_bullets(g.get("when", []) or [], normal))
-                story.append(_p("<b>Then</b>", normal)); story.append(_bullets(g.get("then", []) or [], normal))
-                story.append(Spacer(1, 8))
-
-        notes = tc.get("notes", []) or []
-        if notes:
-            story.append(_p("<b>Notes</b>", normal))
-            story.append(_bullets(notes, normal))
-
-        story.append(Spacer(1, 12))
+        story.extend(_build_tc_flowables(tc, normal, h3))
 
     doc.build(story)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+# List fields that the exports flatten to newline-joined text
+_TC_LIST_FIELDS = ("preconditions", "test_data", "steps", "expected_results", "notes")
+_GHERKIN_LIST_FIELDS = ("given", "when", "then")
+
+
+def join_lines(items: List[str]) -> str:
+    return "\n".join([i for i in items if (i or "").strip()])
+
+
+def prepare_export(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adds the strings both the PDF and the XLSX export need, so they are built
+    once per job instead of once per download:
+    - test case: story_refs_csv and <field>_text for each list field
+    - gherkin scenario: given_text / when_text / then_text
+    The original lists are kept; the PDF still renders them as bullets.
+    """
+    for tc in payload.get("test_cases", []) or []:
+        tc["story_refs_csv"] = ", ".join(tc.get("story_refs", []) or [])
+        for key in _TC_LIST_FIELDS:
+            tc[f"{key}_text"] = join_lines(tc.get(key, []) or [])
+        for g in (tc.get("gherkin", []) or []):
+            for key in _GHERKIN_LIST_FIELDS:
+                g[f"{key}_text"] = join_lines(g.get(key, []) or [])
+    return payload
+
+
+def story_refs_csv(tc: Dict[str, Any]) -> str:
+    csv = tc.get("story_refs_csv")
+    return csv if csv is not None else ", ".join(tc.get("story_refs", []) or [])
+
+
+def field_text(item: Dict[str, Any], key: str) -> str:
+    # Jobs saved before prepare_export existed don't carry the *_text fields
+    text = item.get(f"{key}_text")
+    return text if text is not None else join_lines(item.get(key, []) or [])
@@ -1,78 +1,129 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Sequence
 
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 
+from app.test_case_gen.export_prep import field_text, story_refs_csv
 
-def _join_lines(items: List[str]) -> str:
-    return "\n".join([i for i in items if (i or "").strip()])
+try:
+    import xlsxwriter  # optional: writes the sheet XML directly, constant memory
+except ImportError:
+    xlsxwriter = None
 
 
-def write_testcases_xlsx(payload: Dict[str, Any], out_path: str) -> None:
-    wb = Workbook()
+HEADERS = [
+    "ID",
+    "Category",
+    "Priority",
+    "Title",
+    "Story Refs",
+    "Preconditions",
+    "Test Data",
+    "Steps",
+    "Expected Results",
+    "Notes",
+]
+GHERKIN_HEADERS = ["TC ID", "Feature", "Scenario", "Given", "When", "Then"]
 
-    # Sheet 1: TestCases
-    ws = wb.active
-    ws.title = "TestCases"
-
-    headers = [
-        "ID",
-        "Category",
-        "Priority",
-        "Title",
-        "Story Refs",
-        "Preconditions",
-        "Test Data",
-        "Steps",
-        "Expected Results",
-        "Notes",
-    ]
-    ws.append(headers)
-
-    for tc in payload.get("test_cases", []):
-        ws.append([
+
+def _testcase_rows(test_cases: List[Dict[str, Any]]) -> Iterator[Sequence[Any]]:
+    for tc in test_cases:
+        yield (
             tc.get("id", ""),
             tc.get("category", ""),
             tc.get("priority", ""),
             tc.get("title", ""),
-            ", ".join(tc.get("story_refs", []) or []),
-            _join_lines(tc.get("preconditions", []) or []),
-            _join_lines(tc.get("test_data", []) or []),
-            _join_lines(tc.get("steps", []) or []),
-            _join_lines(tc.get("expected_results", []) or []),
-            _join_lines(tc.get("notes", []) or []),
-        ])
-
-    # Auto-width (simple heuristic)
-    for col in range(1, len(headers) + 1):
-        letter = get_column_letter(col)
-        ws.column_dimensions[letter].width = 22
+            story_refs_csv(tc),
+            field_text(tc, "preconditions"),
+            field_text(tc, "test_data"),
+            field_text(tc, "steps"),
+            field_text(tc, "expected_results"),
+            field_text(tc, "notes"),
+        )
 
-    ws.freeze_panes = "A2"
-    ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}1"
 
-    # Sheet 2: Gherkin
-    ws2 = wb.create_sheet("Gherkin")
-    headers2 = ["TC ID", "Feature", "Scenario", "Given", "When", "Then"]
-    ws2.append(headers2)
-
-    for tc in payload.get("test_cases", []):
+def _gherkin_rows(test_cases: List[Dict[str, Any]]) -> Iterator[Sequence[Any]]:
+    for tc in test_cases:
         tc_id = tc.get("id", "")
         for g in (tc.get("gherkin", []) or []):
-            ws2.append([
+            yield (
                 tc_id,
                 g.get("feature", ""),
                 g.get("scenario", ""),
-                _join_lines(g.get("given", []) or []),
-                _join_lines(g.get("when", []) or []),
-                _join_lines(g.get("then", []) or []),
-            ])
+                field_text(g, "given"),
+                field_text(g, "when"),
+                field_text(g, "then"),
+            )
+
+
+def write_testcases_xlsx(payload: Dict[str, Any], out_path: str) -> None:
+    test_cases = payload.get("test_cases", [])
+    if xlsxwriter is not None:
+        _write_xlsxwriter(test_cases, out_path)
+    else:
+        _write_openpyxl(test_cases, out_path)
+
+
+def _write_xlsxwriter(test_cases: List[Dict[str, Any]], out_path: str) -> None:
+    # constant_memory flushes each row to the sheet XML as soon as the next
+    # one starts, so rows must be written top to bottom
+    wb = xlsxwriter.Workbook(out_path, {"constant_memory": True, "strings_to_urls": False})
+    try:
+        for name, headers, rows, width in (
+            ("TestCases", HEADERS, _testcase_rows(test_cases), 22),
+            ("Gherkin", GHERKIN_HEADERS, _gherkin_rows(test_cases), 24),
+        ):
+            ws = wb.add_worksheet(name)
+            last = len(headers) - 1
+            ws.set_column(0, last, width)
+            ws.freeze_panes(1, 0)
+            ws.autofilter(0, 0, 0, last)
+            ws.write_row(0, 0, headers)
+            for r, row in enumerate(rows, start=1):
+                ws.write_row(r, 0, row)
+    finally:
+        wb.close()
+
 
-    for col in range(1, len(headers2) + 1):
-        ws2.column_dimensions[get_column_letter(col)].width = 24
+def _set_width(ws, n_cols: int, width: float) -> None:
+    # One ColumnDimension spanning columns 1..n_cols (a single <col> entry).
+    # column_dimensions.group() can't be used: it only sets outline/hidden.
+    dim = ws.column_dimensions["A"]
+    dim.width = width
+    dim.min, dim.max = 1, n_cols
+
+
+def _write_openpyxl(test_cases: List[Dict[str, Any]], out_path: str) -> None:
+    # Write-only mode streams rows into the sheet XML instead of keeping a
+    # cell object per value; sheet layout has to be set before the first row.
+    wb = Workbook(write_only=True)
+
+    # Sheet 1: TestCases
+    ws = wb.create_sheet("TestCases")
+
+    # Auto-width (simple heuristic)
+    letters = [get_column_letter(c) for c in range(1, len(HEADERS) + 1)]
+    _set_width(ws, len(HEADERS), 22)
+
+    ws.freeze_panes = "A2"
+    ws.auto_filter.ref = f"A1:{letters[-1]}1"
+
+    ws.append(HEADERS)
+    for row in _testcase_rows(test_cases):
+        ws.append(row)
+
+    # Sheet 2: Gherkin
+    ws2 = wb.create_sheet("Gherkin")
+
+    letters2 = letters[:len(GHERKIN_HEADERS)]
+    _set_width(ws2, len(GHERKIN_HEADERS), 24)
     ws2.freeze_panes = "A2"
-    ws2.auto_filter.ref = f"A1:{get_column_letter(len(headers2))}1"
+    ws2.auto_filter.ref = f"A1:{letters2[-1]}1"
+
+    ws2.append(GHERKIN_HEADERS)
+    for row in _gherkin_rows(test_cases):
+        ws2.append(row)
 
     wb.save(out_path)
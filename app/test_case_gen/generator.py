@@ -1,43 +1,169 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import multiprocessing
 import os
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from itertools import zip_longest
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
+try:
+    import orjson as _json
+except ImportError:  # stdlib fallback
+    _json = json
 
-def _read_txt_bytes(b: bytes) -> str:
+if TYPE_CHECKING:
+    from app.test_case_gen.store import JobStore
+
+# Large inputs are split into shards that are sent to the model concurrently
+OPENAI_MAX_CONCURRENCY = max(1, int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")))
+SHARD_TOKENS = int(os.getenv("OPENAI_SHARD_TOKENS", "6000"))
+
+# Bounds on every request so a slow or runaway completion can't hold a worker
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_MAX_OUTPUT_TOKENS = int(os.getenv("OPENAI_MAX_OUTPUT_TOKENS", "4096"))
+OPENAI_MAX_INPUT_TOKENS = int(os.getenv("OPENAI_MAX_INPUT_TOKENS", "100000"))
+
+# PDFium is not thread-safe, so long PDFs are split into page ranges that are
+# extracted in separate processes
+PDF_WORKERS = max(1, int(os.getenv("PDF_WORKERS", str(min(8, os.cpu_count() or 1)))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    # Created on first use so importing the module doesn't spawn processes.
+    # Workers come from a forkserver, never a fork of this threaded server
+    # process, so they can't inherit a lock held by another request thread.
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _PDF_POOL
+
+
+# Uploaded content: raw bytes, or a binary file object such as UploadFile.file
+Content = Union[bytes, IO[bytes]]
+
+
+def _as_fileobj(content: Content) -> IO[bytes]:
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return BytesIO(content)
+    content.seek(0)
+    return content
+
+
+def _read_txt_bytes(content: Content) -> str:
+    b = content if isinstance(content, (bytes, bytearray)) else _as_fileobj(content).read()
     try:
         return b.decode("utf-8")
     except Exception:
         return b.decode("latin-1", errors="ignore")
 
 
-def extract_text_from_docx(docx_bytes: bytes) -> str:
+def extract_text_from_docx(docx_bytes: Content) -> str:
     try:
         from docx import Document  # python-docx
+        from docx.oxml.ns import qn
     except Exception as e:
         raise RuntimeError(
             "DOCX support is not available because python-docx is missing. "
             "Install it with: pip install python-docx"
         ) from e
 
-    from io import BytesIO
-    doc = Document(BytesIO(docx_bytes))
+    doc = Document(_as_fileobj(docx_bytes))
+    # Walk the body's <w:p> elements directly instead of building a Paragraph
+    # wrapper for each. A paragraph with no <w:t> (or non-breaking hyphen) can
+    # only produce whitespace, so it is skipped without running the text xpath.
+    has_t = ".//" + qn("w:t")
+    has_hyphen = ".//" + qn("w:noBreakHyphen")
     parts: List[str] = []
-    for p in doc.paragraphs:
+    for p in doc.element.body.iterchildren(qn("w:p")):
+        if p.find(has_t) is None and p.find(has_hyphen) is None:
+            continue
         t = (p.text or "").strip()
         if t:
             parts.append(t)
     return "\n".join(parts).strip()
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+def _pdfium_page_text(pdf: Any, index: int) -> str:
+    page = pdf[index]
+    try:
+        textpage = page.get_textpage()
+        try:
+            txt = textpage.get_text_range() or ""
+        finally:
+            textpage.close()
+    except Exception:
+        txt = ""
+    finally:
+        page.close()
+    # PDFium separates lines with CRLF
+    return txt.replace("\r\n", "\n").strip()
+
+
+def _pdfium_range_text(data: bytes, start: int, stop: int) -> List[str]:
+    """Worker: text of pages [start, stop) of the PDF in `data`."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(data)
+    try:
+        return [_pdfium_page_text(pdf, i) for i in range(start, stop)]
+    finally:
+        pdf.close()
+
+
+def extract_text_from_pdf(pdf_bytes: Content) -> str:
     """
     PDF text extraction (no OCR).
-    Uses PyPDF2 if available.
+    Uses pypdfium2 (PDFium) if available, otherwise PyPDF2.
+    PDFs with PDF_PARALLEL_MIN_PAGES or more pages are split across
+    PDF_WORKERS processes.
     """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return _extract_text_from_pdf_pypdf2(pdf_bytes)
+
+    fileobj = _as_fileobj(pdf_bytes)
+    pdf = pdfium.PdfDocument(fileobj)
+    try:
+        n_pages = len(pdf)
+        parallel = PDF_WORKERS > 1 and n_pages >= PDF_PARALLEL_MIN_PAGES
+        texts = [] if parallel else [_pdfium_page_text(pdf, i) for i in range(n_pages)]
+    finally:
+        pdf.close()
+
+    if parallel:
+        fileobj.seek(0)
+        data = fileobj.read()
+        step = -(-n_pages // PDF_WORKERS)
+        pool = _get_pdf_pool()
+        futures = [
+            pool.submit(_pdfium_range_text, data, start, min(start + step, n_pages))
+            for start in range(0, n_pages, step)
+        ]
+        # Ranges are submitted in order, so page order is preserved
+        texts = [t for f in futures for t in f.result()]
+
+    return "\n".join(t for t in texts if t).strip()
+
+
+def _extract_text_from_pdf_pypdf2(pdf_bytes: Content) -> str:
     try:
         import PyPDF2
     except Exception as e:
@@ -46,8 +172,7 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
             "Install it with: pip install PyPDF2"
         ) from e
 
-    from io import BytesIO
-    reader = PyPDF2.PdfReader(BytesIO(pdf_bytes))
+    reader = PyPDF2.PdfReader(_as_fileobj(pdf_bytes))
     parts: List[str] = []
     for page in reader.pages:
         try:
@@ -60,18 +185,64 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
     return "\n".join(parts).strip()
 
 
-def extract_text(filename: str, content_type: str, content: bytes) -> str:
+_HASH_CHUNK = 1 << 20
+
+
+def _content_key(kind: str, content: Content) -> str:
+    """
+    Cache key for extracted text: parser kind, byte size and BLAKE2b digest.
+    File objects are hashed in chunks and rewound.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        h.update(content)
+        size = len(content)
+    else:
+        fp = _as_fileobj(content)
+        size = 0
+        for chunk in iter(lambda: fp.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+            size += len(chunk)
+        fp.seek(0)
+    return f"{kind}_{size}_{h.hexdigest()}"
+
+
+def extract_text(
+    filename: str,
+    content_type: str,
+    content: Content,
+    store: Optional["JobStore"] = None,
+) -> str:
+    """
+    Picks the extractor from the filename / content type. With a store, the
+    extracted text is cached on disk by content hash, so re-uploading the
+    same document skips the parse.
+    """
     name = (filename or "").lower()
     ctype = (content_type or "").lower()
 
     if name.endswith(".docx") or "word" in ctype or "officedocument" in ctype:
-        return extract_text_from_docx(content)
+        kind, extractor = "docx", extract_text_from_docx
+    elif name.endswith(".pdf") or "pdf" in ctype:
+        kind, extractor = "pdf", extract_text_from_pdf
+    else:
+        # Default: treat as text
+        kind, extractor = "txt", _read_txt_bytes
+
+    if store is None:
+        return extractor(content)
+
+    key = _content_key(kind, content)
+    cached = store.load_text(key)
+    if cached is not None:
+        return cached
+
+    text = extractor(content)
+    store.save_text(key, text)
+    return text
 
-    if name.endswith(".pdf") or "pdf" in ctype:
-        return extract_text_from_pdf(content)
 
-    # Default: treat as text
-    return _read_txt_bytes(content)
+_JSON_DECODER = json.JSONDecoder()
 
 
 def _safe_json_loads(s: str) -> Dict[str, Any]:
@@ -82,12 +253,26 @@ def _safe_json_loads(s: str) -> Dict[str, Any]:
     if not s:
         raise ValueError("Empty AI response.")
 
+    # json_object mode returns bare JSON, so the scan below is only a fallback.
+    # A scalar or array reply falls through to the scan for an object.
+    try:
+        result = _json.loads(s)
+    except ValueError:
+        pass
+    else:
+        if isinstance(result, dict):
+            return result
+
+    # Parse from each "{" in turn and stop at the end of the first complete
+    # object: no rfind, no slicing, and text or a second block after it
+    # (markdown fences, trailing notes) is never looked at
     start = s.find("{")
-    end = s.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError("AI response did not contain valid JSON.")
-    raw = s[start : end + 1]
-    return json.loads(raw)
+    while start != -1:
+        try:
+            return _JSON_DECODER.raw_decode(s, start)[0]
+        except ValueError:
+            start = s.find("{", start + 1)
+    raise ValueError("AI response did not contain valid JSON.")
 
 
 def _build_prompt(jira_text: str, design_text: str, extra_text: str) -> Tuple[str, str]:
@@ -170,6 +355,29 @@ INSTRUCTIONS:
     return system, schema + "\n\n" + user
 
 
+def _chat_request(use_model: str, system: str, user: str) -> Dict[str, Any]:
+    """
+    Keyword arguments for chat.completions.create. Rejects prompts over
+    OPENAI_MAX_INPUT_TOKENS before spending a round-trip on them.
+    """
+    n = _estimate_tokens(system) + _estimate_tokens(user)
+    if n > OPENAI_MAX_INPUT_TOKENS:
+        raise ValueError(
+            f"Input is too large (~{n} tokens, limit {OPENAI_MAX_INPUT_TOKENS}). "
+            "Please upload smaller documents or trim 'Other information'."
+        )
+    return {
+        "model": use_model,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        "temperature": 0.2,
+        "max_tokens": OPENAI_MAX_OUTPUT_TOKENS,
+        "response_format": {"type": "json_object"},
+    }
+
+
 def generate_sit_test_cases(
     jira_text: str,
     design_text: str,
@@ -180,19 +388,12 @@ def generate_sit_test_cases(
     if not api_key:
         raise RuntimeError("Missing OPENAI_API_KEY environment variable. Please set it and restart the app.")
 
-    client = OpenAI(api_key=api_key)
+    client = OpenAI(api_key=api_key, timeout=OPENAI_TIMEOUT, max_retries=OPENAI_MAX_RETRIES)
 
     system, user = _build_prompt(jira_text, design_text, extra_text)
     use_model = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
 
-    resp = client.chat.completions.create(
-        model=use_model,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        temperature=0.2,
-    )
+    resp = client.chat.completions.create(**_chat_request(use_model, system, user))
 
     content = resp.choices[0].message.content if resp.choices else ""
     data = _safe_json_loads(content)
@@ -201,3 +402,126 @@ def generate_sit_test_cases(
     if "test_cases" not in data or not isinstance(data["test_cases"], list):
         raise ValueError("AI output JSON was missing 'test_cases' list.")
     return data
+
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    try:
+        import tiktoken  # optional: exact token counts
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def _estimate_tokens(text: str) -> int:
+    enc = _token_encoder()
+    if enc is None:
+        return len(text) // 4  # ~4 chars per token for English prose
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def _split_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits text on line boundaries into chunks of at most ~max_tokens.
+    """
+    if not text:
+        return []
+    chunks: List[str] = []
+    cur: List[str] = []
+    cur_tokens = 0
+    for line in text.splitlines():
+        n = _estimate_tokens(line) + 1
+        if cur and cur_tokens + n > max_tokens:
+            chunks.append("\n".join(cur))
+            cur, cur_tokens = [], 0
+        cur.append(line)
+        cur_tokens += n
+    if cur:
+        chunks.append("\n".join(cur))
+    return chunks
+
+
+def _shard_inputs(jira_text: str, design_text: str) -> List[Tuple[str, str]]:
+    if _estimate_tokens(jira_text) + _estimate_tokens(design_text) <= SHARD_TOKENS:
+        return [(jira_text, design_text)]
+    half = max(1, SHARD_TOKENS // 2)
+    return list(zip_longest(_split_text(jira_text, half), _split_text(design_text, half), fillvalue=""))
+
+
+def _dedupe(items: List[str]) -> List[str]:
+    return list(dict.fromkeys(i for i in items if (i or "").strip()))
+
+
+def _merge_shard_results(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Unions the per-shard suites: summaries are concatenated, test cases are
+    appended in shard order and renumbered TC-001, TC-002, ...
+    """
+    scope_notes: List[str] = []
+    assumptions: List[str] = []
+    out_of_scope: List[str] = []
+    test_cases: List[Dict[str, Any]] = []
+    for data in parts:
+        summary = data.get("summary", {}) or {}
+        if (summary.get("scope_notes") or "").strip():
+            scope_notes.append(summary["scope_notes"].strip())
+        assumptions.extend(summary.get("assumptions", []) or [])
+        out_of_scope.extend(summary.get("out_of_scope", []) or [])
+        test_cases.extend(data["test_cases"])
+
+    for i, tc in enumerate(test_cases, start=1):
+        tc["id"] = f"TC-{i:03d}"
+
+    return {
+        "summary": {
+            "scope_notes": "\n\n".join(scope_notes),
+            "assumptions": _dedupe(assumptions),
+            "out_of_scope": _dedupe(out_of_scope),
+        },
+        "test_cases": test_cases,
+    }
+
+
+async def generate_sit_test_cases_async(
+    jira_text: str,
+    design_text: str,
+    extra_text: str,
+    model: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Async variant of generate_sit_test_cases. Inputs over SHARD_TOKENS are
+    split into shards, each shard is sent as its own request (at most
+    OPENAI_MAX_CONCURRENCY in flight) and the partial suites are merged.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("Missing OPENAI_API_KEY environment variable. Please set it and restart the app.")
+
+    use_model = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    shards = _shard_inputs(jira_text, design_text)
+    sem = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+    async def _one(client: AsyncOpenAI, idx: int, jira_part: str, design_part: str) -> Dict[str, Any]:
+        system, user = _build_prompt(jira_part, design_part, extra_text)
+        if len(shards) > 1:
+            system += (
+                f"\n\nThe inputs are split into {len(shards)} parts; this is part {idx}. "
+                "Generate test cases for the stories and design content in this part only."
+            )
+        request = _chat_request(use_model, system, user)
+        async with sem:
+            resp = await client.chat.completions.create(**request)
+        content = resp.choices[0].message.content if resp.choices else ""
+        data = _safe_json_loads(content)
+        if "test_cases" not in data or not isinstance(data["test_cases"], list):
+            raise ValueError("AI output JSON was missing 'test_cases' list.")
+        return data
+
+    async with AsyncOpenAI(api_key=api_key, timeout=OPENAI_TIMEOUT, max_retries=OPENAI_MAX_RETRIES) as client:
+        parts = await asyncio.gather(
+            *(_one(client, i, j, d) for i, (j, d) in enumerate(shards, start=1))
+        )
+
+    if len(parts) == 1:
+        return parts[0]
+    return _merge_shard_results(list(parts))
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import io
 import os
+import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 
-from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from jinja2 import ChoiceLoader, FileSystemLoader
 
-from app.test_case_gen.generator import extract_text, generate_sit_test_cases
+from app.test_case_gen.generator import extract_text, generate_sit_test_cases_async
 from app.test_case_gen.export_pdf import write_testcases_pdf
+from app.test_case_gen.export_prep import prepare_export
 from app.test_case_gen.export_xlsx import write_testcases_xlsx
 from app.test_case_gen.store import JobStore
 
@@ -37,6 +41,39 @@ def _bad_request(msg: str) -> HTTPException:
     return HTTPException(status_code=400, detail=msg)
 
 
+def _write_atomic(path: str, fill: Callable[[str], None]) -> None:
+    """
+    Lets `fill` write a temp file next to `path`, then renames it into place,
+    so a download racing a background write never serves a half-written file.
+    """
+    if os.path.exists(path):
+        return
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        fill(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _render_to(writer: Callable[[Dict[str, Any], str], None], payload: Dict[str, Any], path: str) -> None:
+    _write_atomic(path, lambda tmp: writer(payload, tmp))
+
+
+def _persist(data: bytes, path: str) -> None:
+    _write_atomic(path, lambda tmp: Path(tmp).write_bytes(data))
+
+
+async def _prerender(job_id: str, payload: Dict[str, Any]) -> None:
+    # PDF and XLSX are independent: render them side by side off the loop
+    paths = store.paths(job_id)
+    await asyncio.gather(
+        asyncio.to_thread(_render_to, write_testcases_pdf, payload, paths.pdf_path),
+        asyncio.to_thread(_render_to, write_testcases_xlsx, payload, paths.xlsx_path),
+    )
+
+
 @router.get("/", response_class=HTMLResponse)
 def upload_form(request: Request):
     store.cleanup_old()
@@ -46,39 +83,54 @@ def upload_form(request: Request):
 @router.post("/", response_class=HTMLResponse)
 async def generate(
     request: Request,
+    background_tasks: BackgroundTasks,
     jira_file: Optional[UploadFile] = File(default=None),
     design_file: Optional[UploadFile] = File(default=None),
     extra_info: str = Form(default=""),
 ):
     try:
+        # UploadFile.file is already spooled (to disk past 1 MB); the
+        # extractors parse it in place instead of copying it into memory,
+        # on a worker thread so PDF/DOCX parsing doesn't block the loop.
         jira_text = ""
         design_text = ""
 
         if jira_file and jira_file.filename:
-            jira_text = extract_text(
+            jira_text = await asyncio.to_thread(
+                extract_text,
                 jira_file.filename,
                 jira_file.content_type or "",
-                await jira_file.read(),
+                jira_file.file,
+                store,
             )
 
         if design_file and design_file.filename:
-            design_text = extract_text(
+            design_text = await asyncio.to_thread(
+                extract_text,
                 design_file.filename,
                 design_file.content_type or "",
-                await design_file.read(),
+                design_file.file,
+                store,
             )
 
         if not jira_text and not design_text and not extra_info.strip():
             raise _bad_request("Please upload at least one document or provide text in 'Other information'.")
 
-        payload = generate_sit_test_cases(
+        payload = await generate_sit_test_cases_async(
             jira_text=jira_text.strip(),
             design_text=design_text.strip(),
             extra_text=extra_info.strip(),
         )
 
+        # Joined export strings are built once here and saved with the job
+        payload = prepare_export(payload)
+
         job_id = store.new_job_id()
-        store.save_json(job_id, payload)
+        await asyncio.to_thread(store.save_json, job_id, payload)
+
+        # Pre-render both downloads once the page is sent; the download
+        # endpoints then just serve the files.
+        background_tasks.add_task(_prerender, job_id, payload)
 
         return templates.TemplateResponse(
             "test_case_result.html",
@@ -97,31 +149,43 @@ async def generate(
 
 
 @router.get("/{job_id}/pdf")
-def download_pdf(job_id: str):
+def download_pdf(job_id: str, background_tasks: BackgroundTasks):
+    path = store.paths(job_id).pdf_path
+    filename = f"SIT_Test_Cases_{job_id}.pdf"
+    if os.path.exists(path):
+        return FileResponse(
+            path,
+            media_type="application/pdf",
+            filename=filename,
+        )
+
+    # Background render not finished (or never ran): render into memory,
+    # serve that, and write the file to disk after the response
     payload = store.load_json(job_id)
     if not payload:
         raise HTTPException(status_code=404, detail="Test case job not found")
 
-    path = store.paths(job_id).pdf_path
-    if not os.path.exists(path):
-        write_testcases_pdf(payload, path)
+    buf = io.BytesIO()
+    write_testcases_pdf(payload, buf)
+    background_tasks.add_task(_persist, buf.getvalue(), path)
+    buf.seek(0)
 
-    return FileResponse(
-        path,
+    return StreamingResponse(
+        buf,
         media_type="application/pdf",
-        filename=f"SIT_Test_Cases_{job_id}.pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
 @router.get("/{job_id}/xlsx")
 def download_xlsx(job_id: str):
-    payload = store.load_json(job_id)
-    if not payload:
-        raise HTTPException(status_code=404, detail="Test case job not found")
-
     path = store.paths(job_id).xlsx_path
     if not os.path.exists(path):
-        write_testcases_xlsx(payload, path)
+        # Background render not finished (or never ran): render inline
+        payload = store.load_json(job_id)
+        if not payload:
+            raise HTTPException(status_code=404, detail="Test case job not found")
+        _render_to(write_testcases_xlsx, payload, path)
 
     return FileResponse(
         path,
@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+import gzip
 import json
 import os
+import tempfile
 import time
 import uuid
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
 
 @dataclass
 class JobPaths:
@@ -17,6 +32,10 @@ class JobPaths:
     def json_path(self) -> str:
         return os.path.join(self.base_dir, f"{self.job_id}.json")
 
+    @property
+    def json_gz_path(self) -> str:
+        return os.path.join(self.base_dir, f"{self.job_id}.json.gz")
+
     @property
     def pdf_path(self) -> str:
         return os.path.join(self.base_dir, f"{self.job_id}.pdf")
@@ -38,6 +57,12 @@ class JobStore:
         self.base_dir = base_dir
         self.ttl_seconds = ttl_seconds
         os.makedirs(self.base_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def cache_dir(self) -> str:
+        # Extracted upload text, keyed by content hash
+        return os.path.join(self.base_dir, "_cache")
 
     def new_job_id(self) -> str:
         return uuid.uuid4().hex
@@ -49,35 +74,70 @@ class JobStore:
         paths = self.paths(job_id)
         payload2 = dict(payload)
         payload2["_meta"] = {"saved_at": int(time.time())}
-        with open(paths.json_path, "w", encoding="utf-8") as f:
-            json.dump(payload2, f, ensure_ascii=False, indent=2)
+        # Machine-read only: compact JSON, gzip level 1 (fast, still ~5-10x smaller)
+        with gzip.open(paths.json_gz_path, "wb", compresslevel=1) as f:
+            f.write(_dumps(payload2))
 
     def load_json(self, job_id: str) -> Optional[Dict[str, Any]]:
         paths = self.paths(job_id)
+        try:
+            with gzip.open(paths.json_gz_path, "rb") as f:
+                return _loads(f.read())
+        except FileNotFoundError:
+            pass
+        # Jobs saved before payloads were gzipped
         if not os.path.exists(paths.json_path):
             return None
-        with open(paths.json_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(paths.json_path, "rb") as f:
+            return _loads(f.read())
 
     def exists(self, job_id: str) -> bool:
-        return os.path.exists(self.paths(job_id).json_path)
+        paths = self.paths(job_id)
+        return os.path.exists(paths.json_gz_path) or os.path.exists(paths.json_path)
+
+    def load_text(self, key: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.txt"), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save_text(self, key: str, text: str) -> None:
+        # Write to a temp file and rename, so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, os.path.join(self.cache_dir, f"{key}.txt"))
+        except BaseException:
+            os.remove(tmp)
+            raise
 
     def cleanup_old(self) -> None:
+        # A job's age is its JSON file's mtime: one stat per job, no parsing
         now = int(time.time())
-        for name in os.listdir(self.base_dir):
-            if not name.endswith(".json"):
-                continue
-            path = os.path.join(self.base_dir, name)
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                saved_at = int(data.get("_meta", {}).get("saved_at", 0))
-                if saved_at and (now - saved_at) > self.ttl_seconds:
-                    job_id = name.replace(".json", "")
-                    paths = self.paths(job_id)
-                    for p in (paths.json_path, paths.pdf_path, paths.xlsx_path):
-                        if os.path.exists(p):
-                            os.remove(p)
-            except Exception:
-                # Best-effort cleanup; ignore malformed files
-                continue
+        with os.scandir(self.base_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json.gz"):
+                    job_id = entry.name[: -len(".json.gz")]
+                elif entry.name.endswith(".json"):
+                    job_id = entry.name[: -len(".json")]
+                else:
+                    continue
+                try:
+                    if (now - entry.stat().st_mtime) > self.ttl_seconds:
+                        paths = self.paths(job_id)
+                        for p in (paths.json_gz_path, paths.json_path, paths.pdf_path, paths.xlsx_path):
+                            if os.path.exists(p):
+                                os.remove(p)
+                except OSError:
+                    # Best-effort cleanup; ignore files that vanish underneath us
+                    continue
+
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                try:
+                    if (now - entry.stat().st_mtime) > self.ttl_seconds:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
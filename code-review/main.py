@@ -9,7 +9,7 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
 from review_logic import (
-    generate_code_review_report,
+    generate_code_review_report_async,
     StandardsDocInvalidError,
 )  # NOTE: no relative import
 
@@ -87,7 +87,7 @@ async def run_review(
 
 
         try:
-            report = generate_code_review_report(
+            report = await generate_code_review_report_async(
                 standards_docx_path=standards_path,
                 repo_root=repo_root,
                 project_name=project_name.strip(),
@@ -1,12 +1,39 @@
+import asyncio
+import copy
+import hashlib
 import json
+import logging
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from docx import Document
-from openai import OpenAI
+from docx.oxml.ns import qn
+from openai import AsyncOpenAI, OpenAI
+
+from semantic_cache import SemanticVerdictCache  # NOTE: no relative import
+
+try:
+    import orjson
+
+    def _dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback
+    def _dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys).encode("utf-8")
+
+    _loads = json.loads
+
+
+logger = logging.getLogger(__name__)
 
 
 # -----------------------------
@@ -21,6 +48,10 @@ class StandardsDocInvalidError(Exception):
 # -----------------------------
 MODEL_VALIDATE = "gpt-4.1-mini"
 MODEL_REVIEW = "gpt-4.1-mini"
+# Output caps: the verdict is a small JSON object, the report is bounded by
+# its issue and checklist lists
+VALIDATE_MAX_TOKENS = int(os.getenv("VALIDATE_MAX_TOKENS", "400"))
+REVIEW_MAX_TOKENS = int(os.getenv("REVIEW_MAX_TOKENS", "6000"))
 
 EXCLUDE_DIRS = {
     ".git", ".venv", "venv", "__pycache__", ".pytest_cache", ".mypy_cache",
@@ -28,37 +59,104 @@ EXCLUDE_DIRS = {
 }
 MAX_FILES = 180
 MAX_FILE_CHARS = 35_000  # keep token usage sane
+MAX_FILE_BYTES = MAX_FILE_CHARS * 4  # enough bytes for MAX_FILE_CHARS of any UTF-8
+STANDARDS_MAX_CHARS = 12_000  # longest standards prefix any prompt uses
+MAX_SNIPPETS = 50
+MAX_FINDINGS = 120
+SNIPPET_MAX_CHARS = 1500
+# File reads dominate the scan, so use more threads than cores
+SCAN_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+
+# Concurrent LLM calls for generate_code_review_report_many; the client
+# retries 429/5xx responses with exponential backoff
+OPENAI_MAX_CONCURRENCY = max(1, int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+
+# LLM results that only depend on their request are cached here
+CACHE_DIR = Path(os.getenv("AISDLC_CACHE_DIR", "~/.cache/ai-sdlc")).expanduser()
+VERDICT_CACHE_MAX = 512
+REPORT_CACHE_MAX = int(os.getenv("REPORT_CACHE_MAX", "256"))
+
+# Near-duplicate standards docs (re-exports, small edits) reuse a verdict
+# when their embeddings are this similar; set SEMANTIC_VERDICT_CACHE=0 to
+# use exact matches only
+SEMANTIC_VERDICT_CACHE = os.getenv("SEMANTIC_VERDICT_CACHE", "1") != "0"
+SEMANTIC_VERDICT_THRESHOLD = float(os.getenv("SEMANTIC_VERDICT_THRESHOLD", "0.97"))
+MODEL_EMBED = "text-embedding-3-small"
+EMBED_DIMENSIONS = 256
+EMBED_MAX_CHARS = 8000
 
 
 # -----------------------------
 # Utilities
 # -----------------------------
-def _read_docx_text(docx_path: Path) -> str:
+def _read_docx_text(docx_path: Path, max_chars: int = STANDARDS_MAX_CHARS) -> str:
+    """
+    Paragraph text of the document, stopping once at least max_chars have
+    been collected: the prompts only ever use a prefix of the standards.
+    """
     doc = Document(str(docx_path))
     parts: List[str] = []
-    for p in doc.paragraphs:
+    total = 0
+    # Walk the body's <w:p> elements lazily instead of building the full
+    # doc.paragraphs list of wrappers
+    for p in doc.element.body.iterchildren(qn("w:p")):
         t = (p.text or "").strip()
         if t:
             parts.append(t)
+            total += len(t) + 1
+            if total >= max_chars:
+                break
     return "\n".join(parts)
 
 
 def _iter_py_files(repo_root: Path) -> List[Path]:
+    """
+    Up to MAX_FILES .py files, walking directories in sorted order and never
+    descending into EXCLUDE_DIRS (venvs, node_modules, .git, ...).
+    """
     out: List[Path] = []
-    for p in repo_root.rglob("*.py"):
-        if any(part in EXCLUDE_DIRS for part in p.parts):
+    stack = [str(repo_root)]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
             continue
-        out.append(p)
-        if len(out) >= MAX_FILES:
-            break
+
+        subdirs: List[str] = []
+        for e in entries:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in EXCLUDE_DIRS:
+                        subdirs.append(e.path)
+                elif e.name.endswith(".py") and e.is_file():
+                    out.append(Path(e.path))
+                    if len(out) >= MAX_FILES:
+                        return out
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
     return out
 
 
 def _read_text(path: Path) -> str:
+    """
+    First MAX_FILE_CHARS of the file, from a single bounded read. Decodes as
+    UTF-8, else latin-1, with text-mode newline translation.
+    """
+    with open(path, "rb") as fh:
+        buf = fh.read(MAX_FILE_BYTES)
     try:
-        return path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        return path.read_text(encoding="latin-1", errors="ignore")
+        text = buf.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if len(buf) == MAX_FILE_BYTES and e.reason == "unexpected end of data":
+            # the read cut a multi-byte character in half
+            text = buf[:e.start].decode("utf-8")
+        else:
+            text = buf.decode("latin-1")
+    return text.replace("\r\n", "\n").replace("\r", "\n")[:MAX_FILE_CHARS]
 
 
 def _rel(repo_root: Path, f: Path) -> str:
@@ -66,7 +164,21 @@ def _rel(repo_root: Path, f: Path) -> str:
 
 
 def _line_number(text: str, idx: int) -> int:
-    return text[:idx].count("\n") + 1
+    return text.count("\n", 0, idx) + 1
+
+
+def _line_numbers(text: str, offsets: List[int]) -> Dict[int, int]:
+    """
+    Line numbers for several offsets in one forward walk: newlines are counted
+    only between consecutive hits, without copying any prefix of the text.
+    """
+    out: Dict[int, int] = {}
+    line, prev = 1, 0
+    for idx in sorted(offsets):
+        line += text.count("\n", prev, idx)
+        out[idx] = line
+        prev = idx
+    return out
 
 
 def _extract_json_object(text: str) -> str:
@@ -82,6 +194,30 @@ def _extract_json_object(text: str) -> str:
     return text[start:end + 1]
 
 
+def _loads_reply(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    JSON-mode replies are the object itself; None means fall back to
+    _extract_json_object (e.g. a reply wrapped in markdown fences).
+    """
+    try:
+        data = _loads(raw)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _log_usage(stage: str, resp: Any) -> None:
+    """Logs token usage per call, to tune the max_tokens caps from real data."""
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        logger.info(
+            "%s: prompt_tokens=%s completion_tokens=%s",
+            stage, usage.prompt_tokens, usage.completion_tokens,
+        )
+    if resp.choices and resp.choices[0].finish_reason == "length":
+        logger.warning("%s: reply was cut off at max_tokens", stage)
+
+
 def _get_client() -> OpenAI:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -89,21 +225,18 @@ def _get_client() -> OpenAI:
     return OpenAI(api_key=api_key)
 
 
+def _get_async_client() -> AsyncOpenAI:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is not set.")
+    return AsyncOpenAI(api_key=api_key, max_retries=OPENAI_MAX_RETRIES)
+
+
 # -----------------------------
 # Stage 1: LLM validation
 # -----------------------------
-def llm_validate_standards_doc(doc_text: str) -> Dict[str, Any]:
-    """
-    Returns:
-      {
-        "is_standards_doc": bool,
-        "confidence": 0-1,
-        "reasons": [..],
-        "document_type": "python_coding_standards" | "generic_tech_doc" | ...
-      }
-    """
-    client = _get_client()
-
+def _validation_request(doc_text: str) -> Dict[str, Any]:
+    """chat.completions.create arguments for the Stage-1 validator."""
     system = (
         "You are a senior software engineering standards reviewer. "
         "Your task is to judge whether the provided text is a genuine "
@@ -132,50 +265,241 @@ TEXT:
 \"\"\"{doc_text[:9000]}\"\"\"
 """
 
-    resp = client.chat.completions.create(
-        model=MODEL_VALIDATE,
-        messages=[
+    return {
+        "model": MODEL_VALIDATE,
+        "messages": [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ],
-        temperature=0.0,
-    )
+        "temperature": 0.0,
+        "max_tokens": VALIDATE_MAX_TOKENS,
+        "response_format": {"type": "json_object"},
+    }
+
 
-    raw = resp.choices[0].message.content or ""
+def _load_verdict(raw: str) -> Dict[str, Any]:
+    data = _loads_reply(raw)
+    if data is not None:
+        return data
     js = _extract_json_object(raw)
     if not js:
+        raise ValueError("Could not parse validator output as JSON.")
+    try:
+        return _loads(js)
+    except Exception:
+        raise ValueError("Validator returned invalid JSON.")
+
+
+def _parse_verdict(raw: str) -> Dict[str, Any]:
+    try:
+        return _load_verdict(raw)
+    except ValueError as e:
         # be strict: if model didn't comply, treat as invalid
         return {
             "is_standards_doc": False,
             "confidence": 0.0,
             "document_type": "other",
-            "reasons": ["Could not parse validator output as JSON."],
+            "reasons": [str(e)],
             "missing_expected_sections": [],
         }
 
+
+# Verdicts keyed by a hash of the full validator request (model, prompt and
+# document text), so a prompt or model change never reuses an old verdict.
+# One standards doc is typically reused across many repos.
+_VERDICT_CACHE_PATH = CACHE_DIR / "verdicts.json"
+_verdict_cache: Optional[Dict[str, Dict[str, Any]]] = None
+_verdict_lock = threading.Lock()
+
+
+def _request_key(request: Dict[str, Any]) -> str:
+    return hashlib.sha256(_dumps(request, sort_keys=True)).hexdigest()
+
+
+def _verdicts() -> Dict[str, Dict[str, Any]]:
+    # caller holds _verdict_lock
+    global _verdict_cache
+    if _verdict_cache is None:
+        try:
+            _verdict_cache = _loads(_VERDICT_CACHE_PATH.read_bytes())
+        except (OSError, ValueError):
+            _verdict_cache = {}
+    return _verdict_cache
+
+
+def _get_cached_verdict(key: str) -> Optional[Dict[str, Any]]:
+    with _verdict_lock:
+        verdict = _verdicts().get(key)
+    return copy.deepcopy(verdict) if verdict is not None else None
+
+
+def _put_cached_verdict(key: str, verdict: Dict[str, Any]) -> None:
+    with _verdict_lock:
+        cache = _verdicts()
+        cache.pop(key, None)
+        cache[key] = copy.deepcopy(verdict)
+        while len(cache) > VERDICT_CACHE_MAX:
+            cache.pop(next(iter(cache)))
+        try:
+            _VERDICT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp = _VERDICT_CACHE_PATH.with_name(f"{_VERDICT_CACHE_PATH.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(_dumps(cache))
+            os.replace(tmp, _VERDICT_CACHE_PATH)
+        except OSError:
+            # read-only filesystem: in-process cache only
+            pass
+
+
+_semantic_verdicts = SemanticVerdictCache(
+    CACHE_DIR / "verdicts.sqlite3", threshold=SEMANTIC_VERDICT_THRESHOLD
+)
+
+
+def _embed_request(doc_text: str) -> Dict[str, Any]:
+    return {"model": MODEL_EMBED, "input": doc_text[:EMBED_MAX_CHARS], "dimensions": EMBED_DIMENSIONS}
+
+
+def _validator_scope() -> str:
+    # the validator request without a document: changes with prompt or model
+    return _request_key(_validation_request(""))
+
+
+def llm_validate_standards_doc(doc_text: str, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Returns:
+      {
+        "is_standards_doc": bool,
+        "confidence": 0-1,
+        "reasons": [..],
+        "document_type": "python_coding_standards" | "generic_tech_doc" | ...
+      }
+    """
+    request = _validation_request(doc_text)
+    key = _request_key(request)
+    if use_cache:
+        cached = _get_cached_verdict(key)
+        if cached is not None:
+            return cached
+
+    client = _get_client()
+    embedding = None
+    if use_cache and SEMANTIC_VERDICT_CACHE:
+        try:
+            embedding = client.embeddings.create(**_embed_request(doc_text)).data[0].embedding
+        except Exception:
+            pass  # best-effort: fall through to the validator
+        else:
+            similar = _similar_verdict(key, embedding)
+            if similar is not None:
+                return similar
+
+    resp = client.chat.completions.create(**request)
+    _log_usage("validate", resp)
+    return _verdict_from_reply(key, resp.choices[0].message.content or "", use_cache, embedding)
+
+
+def _similar_verdict(key: str, embedding: List[float]) -> Optional[Dict[str, Any]]:
+    verdict = _semantic_verdicts.lookup(_validator_scope(), embedding)
+    if verdict is not None:
+        # next time the exact cache answers without an embedding call
+        _put_cached_verdict(key, verdict)
+    return verdict
+
+
+def _verdict_from_reply(
+    key: str,
+    raw: str,
+    use_cache: bool,
+    embedding: Optional[List[float]] = None,
+) -> Dict[str, Any]:
     try:
-        data = json.loads(js)
-    except Exception:
-        return {
-            "is_standards_doc": False,
-            "confidence": 0.0,
-            "document_type": "other",
-            "reasons": ["Validator returned invalid JSON."],
-            "missing_expected_sections": [],
-        }
+        verdict = _load_verdict(raw)
+    except ValueError:
+        # unparseable output is not cached; the next run asks again
+        return _parse_verdict(raw)
 
-    return data
+    if use_cache:
+        _put_cached_verdict(key, verdict)
+        if embedding is not None:
+            _semantic_verdicts.store(_validator_scope(), embedding, verdict)
+    return verdict
 
 
 # -----------------------------
 # Build compact code pack (token-safe)
 # -----------------------------
+# Quick heuristic rules as (regex, rule name), in report order
+_RULES: Tuple[Tuple[str, str], ...] = (
+    (r"(?i:\b(?:api[_-]?key|secret|password)\b\s*=\s*['\"][^'\"]+['\"])", "possible_secret"),
+    (r"(?m:^\s*print\()", "print_statement"),
+    (r"(?i:\b(?:TODO|FIXME)\b)", "todo_fixme"),
+    (r"except\s*:\s*", "bare_except"),
+    (r"except\s+Exception\s*:", "broad_exception"),
+)
+_RULE_NAMES = tuple(name for _, name in _RULES)
+# Every alternative is a lookahead, so hits of different rules can overlap
+# and each rule still sees its own first match, as with separate searches.
+# Compiled once; scan threads share it.
+_RULES_RX = re.compile("|".join(f"(?=(?P<{name}>{pattern}))" for pattern, name in _RULES))
+
+
+def _scan_file(
+    repo_root: Path,
+    f: Path,
+    want_snippet: bool = True,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Reads one file and returns (file_index entry, head snippet or None,
+    quick findings).
+    """
+    rel = _rel(repo_root, f)
+    txt = _read_text(f)
+    lines = txt.splitlines()
+
+    entry = {
+        "path": rel,
+        "lines": len(lines),
+        "chars": len(txt),
+    }
+
+    # Snippet: header + first 80 lines is usually enough for LLM context;
+    # capped in chars too, since a few long lines can eat the prompt budget
+    snippet = None
+    if want_snippet:
+        head = "\n".join(lines[:80])[:SNIPPET_MAX_CHARS]
+        snippet = {"path": rel, "snippet_type": "head", "content": head}
+
+    # Quick pattern hits with line numbers: one pass over the text for all
+    # rules, keeping the first hit of each
+    first_hit: Dict[str, int] = {}
+    for m in _RULES_RX.finditer(txt):
+        first_hit.setdefault(m.lastgroup, m.start())
+        if len(first_hit) == len(_RULE_NAMES):
+            break
+
+    line_of = _line_numbers(txt, list(first_hit.values()))
+    findings: List[Dict[str, Any]] = []
+    for rule_name in _RULE_NAMES:
+        start = first_hit.get(rule_name)
+        if start is not None:
+            ln = line_of[start]
+            evidence = txt[start:start+140].replace("\n", " ")
+            findings.append({
+                "path": rel,
+                "rule": rule_name,
+                "line": ln,
+                "evidence": evidence
+            })
+    return entry, snippet, findings
+
+
 def build_code_pack(repo_root: Path) -> Dict[str, Any]:
     """
     Collects:
     - file list
     - quick heuristics findings to provide evidence/snippets
     - small snippets of important files
+    Files are read and scanned on a thread pool; results keep file order.
     """
     py_files = _iter_py_files(repo_root)
 
@@ -183,49 +507,17 @@ def build_code_pack(repo_root: Path) -> Dict[str, Any]:
     snippets: List[Dict[str, Any]] = []
     quick_findings: List[Dict[str, Any]] = []
 
-    secret_rx = re.compile(r"(?i)\b(api[_-]?key|secret|password)\b\s*=\s*['\"][^'\"]+['\"]")
-    print_rx = re.compile(r"(?m)^\s*print\(")
-    todo_rx = re.compile(r"(?i)\b(TODO|FIXME)\b")
-    bare_except_rx = re.compile(r"except\s*:\s*")
-    broad_except_rx = re.compile(r"except\s+Exception\s*:")
-
-    for f in py_files:
-        rel = _rel(repo_root, f)
-        txt = _read_text(f)[:MAX_FILE_CHARS]
-        lines = txt.splitlines()
-
-        file_index.append({
-            "path": rel,
-            "lines": len(lines),
-            "chars": len(txt),
-        })
-
-        # Snippet: header + first 80 lines is usually enough for LLM context
-        head = "\n".join(lines[:80])
-        snippets.append({"path": rel, "snippet_type": "head", "content": head})
-
-        # Quick pattern hits with line numbers
-        for rx, rule_name in [
-            (secret_rx, "possible_secret"),
-            (print_rx, "print_statement"),
-            (todo_rx, "todo_fixme"),
-            (bare_except_rx, "bare_except"),
-            (broad_except_rx, "broad_exception"),
-        ]:
-            m = rx.search(txt)
-            if m:
-                ln = _line_number(txt, m.start())
-                evidence = txt[m.start():m.start()+140].replace("\n", " ")
-                quick_findings.append({
-                    "path": rel,
-                    "rule": rule_name,
-                    "line": ln,
-                    "evidence": evidence
-                })
-
-    # Keep size under control
-    snippets = snippets[:50]
-    quick_findings = quick_findings[:120]
+    # Only the first MAX_SNIPPETS files get a snippet built
+    want_snippet = [i < MAX_SNIPPETS for i in range(len(py_files))]
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as ex:
+        for entry, snippet, findings in ex.map(partial(_scan_file, repo_root), py_files, want_snippet):
+            file_index.append(entry)
+            if snippet is not None:
+                snippets.append(snippet)
+            # Keep size under control
+            room = MAX_FINDINGS - len(quick_findings)
+            if room > 0:
+                quick_findings.extend(findings[:room])
 
     return {
         "file_index": file_index,
@@ -240,42 +532,54 @@ def build_code_pack(repo_root: Path) -> Dict[str, Any]:
 # -----------------------------
 # Stage 2: LLM standards-driven review
 # -----------------------------
-def llm_generate_review_report(
+# Character budget for the code pack in the review prompt
+CODE_PACK_PROMPT_CHARS = 12_000
+
+
+def _compact_pack_json(code_pack: Dict[str, Any], budget: int = CODE_PACK_PROMPT_CHARS) -> str:
+    """
+    Serializes the code pack for the prompt with short keys and no derivable
+    fields. Whole items are added (file index, then findings, then snippets)
+    as long as they fit in budget, so the result is always valid JSON.
+    """
+    def dumps(obj: Any) -> str:
+        return _dumps(obj).decode("utf-8")
+
+    sections = {
+        "files": [{"p": f["path"], "n": f["lines"]} for f in code_pack.get("file_index", [])],
+        "findings": [
+            {"p": q["path"], "r": q["rule"], "ln": q["line"], "e": q["evidence"]} if q.get("evidence")
+            else {"p": q["path"], "r": q["rule"], "ln": q["line"]}
+            for q in code_pack.get("quick_findings", [])
+        ],
+        "snippets": [{"p": sn["path"], "c": sn["content"]} for sn in code_pack.get("snippets", [])],
+    }
+    scanned = (code_pack.get("stats") or {}).get("python_files_scanned", 0)
+
+    # '{"scanned":N,"files":[],"findings":[],"snippets":[]}'
+    used = len(dumps({"scanned": scanned, **{k: [] for k in sections}}))
+    kept: Dict[str, List[str]] = {}
+    for name, items in sections.items():
+        kept[name] = []
+        for item in items:
+            js = dumps(item)
+            cost = len(js) + (1 if kept[name] else 0)
+            if used + cost > budget:
+                continue
+            kept[name].append(js)
+            used += cost
+
+    body = ",".join(f'"{name}":[{",".join(parts)}]' for name, parts in kept.items())
+    return f'{{"scanned":{scanned},{body}}}'
+
+
+def _review_request(
     standards_text: str,
     code_pack: Dict[str, Any],
     project_name: str,
     prepared_by: str,
 ) -> Dict[str, Any]:
-    """
-    Returns strict JSON:
-    {
-      "project_name": str,
-      "overall_status": "Pass"|"Fail",
-      "summary": str,
-      "issues": [
-        {
-          "category": str,
-          "severity": "Critical"|"High"|"Medium"|"Low",
-          "title": str,
-          "description": str,
-          "file_path": str|null,
-          "line": int|null,
-          "recommendation": str
-        }
-      ],
-      "checklist": [
-        {
-          "category": str,
-          "check": str,
-          "status": "Pass"|"Fail"|"Not Found",
-          "evidence": str|null,
-          "remediation": str|null
-        }
-      ]
-    }
-    """
-    client = _get_client()
-
+    """chat.completions.create arguments for the Stage-2 review."""
     system = (
         "You are an enterprise code reviewer. "
         "Use the provided coding standards text as the rubric. "
@@ -289,7 +593,7 @@ def llm_generate_review_report(
     user = f"""
 You are given:
 1) CODING STANDARDS (rubric) text
-2) A CODE PACK (file list + representative snippets + quick pattern findings)
+2) A CODE PACK (file list + quick pattern findings + representative snippets)
 
 Task:
 - Generate a DETAILED code review report guided by the standards.
@@ -339,27 +643,33 @@ Output JSON schema EXACTLY:
 CODING STANDARDS:
 \"\"\"{standards_for_prompt}\"\"\"
 
-CODE PACK (JSON):
-{json.dumps(code_pack, ensure_ascii=False)[:12000]}
+CODE PACK (JSON; "scanned" = Python files scanned; files: p=path, n=line count;
+findings: p=path, r=rule, ln=line, e=evidence; snippets: p=path, c=first lines of the file):
+{_compact_pack_json(code_pack)}
 """
 
-    resp = client.chat.completions.create(
-        model=MODEL_REVIEW,
-        messages=[
+    return {
+        "model": MODEL_REVIEW,
+        "messages": [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ],
-        temperature=0.2,
-    )
+        "temperature": 0.2,
+        "max_tokens": REVIEW_MAX_TOKENS,
+        "response_format": {"type": "json_object"},
+    }
 
-    raw = resp.choices[0].message.content or ""
-    js = _extract_json_object(raw)
-    if not js:
-        raise RuntimeError("LLM did not return valid JSON for the review report.")
-    try:
-        data = json.loads(js)
-    except Exception:
-        raise RuntimeError("LLM returned invalid JSON for the review report.")
+
+def _parse_review(raw: str) -> Dict[str, Any]:
+    data = _loads_reply(raw)
+    if data is None:
+        js = _extract_json_object(raw)
+        if not js:
+            raise RuntimeError("LLM did not return valid JSON for the review report.")
+        try:
+            data = _loads(js)
+        except Exception:
+            raise RuntimeError("LLM returned invalid JSON for the review report.")
 
     # Minimal sanity checks
     if "overall_status" not in data or "issues" not in data or "checklist" not in data:
@@ -368,6 +678,105 @@ CODE PACK (JSON):
     return data
 
 
+# Raw review reports (before normalize/status policy), one file per review
+# request hash: standards text, code pack, project fields and model.
+_REPORT_CACHE_DIR = CACHE_DIR / "reports"
+
+
+def _get_cached_report(key: str) -> Optional[Dict[str, Any]]:
+    path = _REPORT_CACHE_DIR / f"{key}.json"
+    try:
+        report = _loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    try:
+        # mtime is the recency used by _prune_report_cache
+        os.utime(path)
+    except OSError:
+        pass
+    return report
+
+
+def _prune_report_cache() -> None:
+    """Keeps the REPORT_CACHE_MAX most recently used reports."""
+    try:
+        with os.scandir(_REPORT_CACHE_DIR) as it:
+            files = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".json")]
+    except OSError:
+        return
+    if len(files) <= REPORT_CACHE_MAX:
+        return
+    files.sort()
+    for _, path in files[:len(files) - REPORT_CACHE_MAX]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _put_cached_report(key: str, report: Dict[str, Any]) -> None:
+    path = _REPORT_CACHE_DIR / f"{key}.json"
+    try:
+        _REPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(_dumps(report))
+        os.replace(tmp, path)
+    except OSError:
+        return
+    _prune_report_cache()
+
+
+def llm_generate_review_report(
+    standards_text: str,
+    code_pack: Dict[str, Any],
+    project_name: str,
+    prepared_by: str,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Returns strict JSON:
+    {
+      "project_name": str,
+      "overall_status": "Pass"|"Fail",
+      "summary": str,
+      "issues": [
+        {
+          "category": str,
+          "severity": "Critical"|"High"|"Medium"|"Low",
+          "title": str,
+          "description": str,
+          "file_path": str|null,
+          "line": int|null,
+          "recommendation": str
+        }
+      ],
+      "checklist": [
+        {
+          "category": str,
+          "check": str,
+          "status": "Pass"|"Fail"|"Not Found",
+          "evidence": str|null,
+          "remediation": str|null
+        }
+      ]
+    }
+    """
+    request = _review_request(standards_text, code_pack, project_name, prepared_by)
+    key = _request_key(request)
+    if use_cache:
+        cached = _get_cached_report(key)
+        if cached is not None:
+            return cached
+
+    client = _get_client()
+    resp = client.chat.completions.create(**request)
+    _log_usage("review", resp)
+    report = _parse_review(resp.choices[0].message.content or "")
+    if use_cache:
+        _put_cached_report(key, report)
+    return report
+
+
 # -----------------------------
 # Public entrypoint used by main.py
 # -----------------------------
@@ -376,14 +785,14 @@ def generate_code_review_report(
     repo_root: Path,
     project_name: str,
     prepared_by: str,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     standards_text = _read_docx_text(standards_docx_path)
 
     # Stage 1: Validate standards doc using LLM
-    verdict = llm_validate_standards_doc(standards_text)
+    verdict = llm_validate_standards_doc(standards_text, use_cache=use_cache)
 
-    # Tune threshold as desired
-    if not verdict.get("is_standards_doc", False) or float(verdict.get("confidence", 0.0)) < 0.55:
+    if not _is_valid_verdict(verdict):
         raise StandardsDocInvalidError()
 
     # Stage 2: Build token-safe code pack and run standards-driven review
@@ -394,16 +803,157 @@ def generate_code_review_report(
         code_pack=code_pack,
         project_name=project_name,
         prepared_by=prepared_by,
+        use_cache=use_cache,
+    )
+    return _finalize_report(report, verdict)
+
+
+async def _validate_async(client: AsyncOpenAI, doc_text: str, use_cache: bool) -> Dict[str, Any]:
+    request = _validation_request(doc_text)
+    key = _request_key(request)
+    if use_cache:
+        cached = await asyncio.to_thread(_get_cached_verdict, key)
+        if cached is not None:
+            return cached
+
+    embedding = None
+    if use_cache and SEMANTIC_VERDICT_CACHE:
+        try:
+            embedding = (await client.embeddings.create(**_embed_request(doc_text))).data[0].embedding
+        except Exception:
+            pass
+        else:
+            similar = await asyncio.to_thread(_similar_verdict, key, embedding)
+            if similar is not None:
+                return similar
+
+    resp = await client.chat.completions.create(**request)
+    _log_usage("validate", resp)
+    return await asyncio.to_thread(
+        _verdict_from_reply, key, resp.choices[0].message.content or "", use_cache, embedding
+    )
+
+
+async def _review_async(
+    client: AsyncOpenAI,
+    standards_text: str,
+    code_pack: Dict[str, Any],
+    project_name: str,
+    prepared_by: str,
+    use_cache: bool,
+) -> Dict[str, Any]:
+    request = _review_request(standards_text, code_pack, project_name, prepared_by)
+    key = _request_key(request)
+    if use_cache:
+        cached = await asyncio.to_thread(_get_cached_report, key)
+        if cached is not None:
+            return cached
+    resp = await client.chat.completions.create(**request)
+    _log_usage("review", resp)
+    report = _parse_review(resp.choices[0].message.content or "")
+    if use_cache:
+        await asyncio.to_thread(_put_cached_report, key, report)
+    return report
+
+
+async def generate_code_review_report_async(
+    standards_docx_path: Path,
+    repo_root: Path,
+    project_name: str,
+    prepared_by: str,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Same result as generate_code_review_report, without blocking the event
+    loop. The code pack is built in a worker thread while Stage 1 runs,
+    since the two are independent.
+    """
+    standards_text = await asyncio.to_thread(_read_docx_text, standards_docx_path)
+
+    async with _get_async_client() as client:
+        pack_task = asyncio.create_task(asyncio.to_thread(build_code_pack, repo_root))
+        try:
+            verdict = await _validate_async(client, standards_text, use_cache)
+            if not _is_valid_verdict(verdict):
+                raise StandardsDocInvalidError()
+        except BaseException:
+            # a scan already running in its thread still finishes, unawaited
+            pack_task.cancel()
+            raise
+
+        code_pack = await pack_task
+        report = await _review_async(client, standards_text, code_pack, project_name, prepared_by, use_cache)
+    return _finalize_report(report, verdict)
+
+
+async def generate_code_review_report_many(
+    jobs: List["ReviewJob"],
+    concurrency: int = OPENAI_MAX_CONCURRENCY,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Runs many reviews concurrently over the regular API: results in about the
+    time of the slowest review instead of the sum, and without the Batch API
+    turnaround of submit_review_batch. Jobs that share a standards doc share
+    one validator call; at most `concurrency` LLM calls are in flight.
+
+    Returns {job_id: report dict, or the exception for that job}.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    # An unreadable standards doc fails only the jobs that use it
+    paths = list({job.standards_docx_path for job in jobs})
+    read = await asyncio.gather(
+        *(asyncio.to_thread(_read_docx_text, p) for p in paths), return_exceptions=True
     )
+    text_of = dict(zip(paths, read))
+
+    async with _get_async_client() as client:
+        async def validate(text: str) -> Dict[str, Any]:
+            async with sem:
+                return await _validate_async(client, text, use_cache)
+
+        verdict_tasks = {
+            text: asyncio.create_task(validate(text)) for text in set(read) if isinstance(text, str)
+        }
+
+        async def review(job: "ReviewJob") -> Dict[str, Any]:
+            standards_text = text_of[job.standards_docx_path]
+            if isinstance(standards_text, BaseException):
+                raise standards_text
+            pack_task = asyncio.create_task(asyncio.to_thread(build_code_pack, job.repo_root))
+            try:
+                verdict = await verdict_tasks[standards_text]
+                if not _is_valid_verdict(verdict):
+                    raise StandardsDocInvalidError()
+            except BaseException:
+                pack_task.cancel()
+                raise
+
+            code_pack = await pack_task
+            async with sem:
+                report = await _review_async(
+                    client, standards_text, code_pack, job.project_name, job.prepared_by, use_cache
+                )
+            return _finalize_report(report, copy.deepcopy(verdict))
+
+        results = await asyncio.gather(*(review(job) for job in jobs), return_exceptions=True)
+    return {job.job_id: result for job, result in zip(jobs, results)}
+
+
+def _is_valid_verdict(verdict: Dict[str, Any]) -> bool:
+    # Tune threshold as desired
+    return bool(verdict.get("is_standards_doc", False)) and float(verdict.get("confidence", 0.0)) >= 0.55
+
+
+def _finalize_report(report: Dict[str, Any], verdict: Dict[str, Any]) -> Dict[str, Any]:
     # ✅ Normalize checklist first (convert NA -> Not Found etc.)
     normalize_checklist(report)
 
     # ✅ Recompute overall status using our policy
-        # (Not Found will NOT fail)
+    # (Not Found will NOT fail)
     report["overall_status"] = compute_overall_status(report)
 
-    
-
     # Keep validator verdict for audit (don’t display it on UI unless you want)
     report["_standards_validation"] = {
         "document_type": verdict.get("document_type"),
@@ -412,49 +962,198 @@ def generate_code_review_report(
         "missing_expected_sections": verdict.get("missing_expected_sections", []),
     }
     return report
+
+
+# Lower-cased model status -> canonical status; anything else is Not Found
+_STATUS_MAP = {
+    "pass": "Pass",
+    "fail": "Fail",
+    "not found": "Not Found",
+    "notfound": "Not Found",
+    "not_found": "Not Found",
+    "na": "Not Found",
+    "n/a": "Not Found",
+}
+
+
 def normalize_checklist(report: Dict[str, Any]) -> None:
     """
     Converts any non-standard checklist status to:
     Pass / Fail / Not Found
     """
-    checklist = report.get("checklist") or []
-
-    for c in checklist:
-        s = (c.get("status") or "").strip().lower()
+    for c in report.get("checklist") or ():
+        c["status"] = _STATUS_MAP.get((c.get("status") or "").strip().lower(), "Not Found")
 
-        if s in {"na", "n/a", "notfound", "not_found", ""}:
-            c["status"] = "Not Found"
-        elif s == "pass":
-            c["status"] = "Pass"
-        elif s == "fail":
-            c["status"] = "Fail"
-        elif s == "not found":
-            c["status"] = "Not Found"
-        else:
-            c["status"] = "Not Found"
 
 def compute_overall_status(report: Dict[str, Any]) -> str:
     """
     Computes overall Pass/Fail using app policy.
     IMPORTANT: 'Not Found' checklist items do NOT fail the review.
     """
-
-    issues = report.get("issues") or []
-    checklist = report.get("checklist") or []
-
+    # One pass over issues:
     # Rule 1: Any Critical issue => Fail
-    if any((i.get("severity") or "").strip() == "Critical" for i in issues):
-        return "Fail"
-
     # Rule 2: If you want, define a threshold for High issues
-    high_count = sum(1 for i in issues if (i.get("severity") or "").strip() == "High")
-    if high_count >= 2:
-        return "Fail"
+    high_count = 0
+    for i in report.get("issues") or ():
+        severity = (i.get("severity") or "").strip()
+        if severity == "Critical":
+            return "Fail"
+        if severity == "High":
+            high_count += 1
+            if high_count >= 2:
+                return "Fail"
 
     # Rule 3: Checklist Fail => Fail
     # Not Found DOES NOT count
-    if any((c.get("status") or "").strip() == "Fail" for c in checklist):
-        return "Fail"
+    for c in report.get("checklist") or ():
+        if (c.get("status") or "").strip() == "Fail":
+            return "Fail"
 
     # Otherwise Pass
     return "Pass"
+
+
+# -----------------------------
+# Batch API (offline / bulk reviews)
+# -----------------------------
+# Batch requests are billed at half price and have their own rate limits, in
+# exchange for results that can take up to 24h. Meant for audit pipelines and
+# nightly runs, not the interactive upload flow.
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INITIAL_SECONDS = 10.0
+BATCH_POLL_MAX_SECONDS = 600.0
+_BATCH_TERMINAL = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass
+class ReviewJob:
+    job_id: str
+    standards_docx_path: Path
+    repo_root: Path
+    project_name: str
+    prepared_by: str = ""
+
+
+def _run_batch(client: OpenAI, requests: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Submits {custom_id: chat.completions.create arguments} as one batch,
+    waits for it (exponential backoff) and returns {custom_id: message content}.
+    Requests that errored are missing from the result.
+    """
+    lines = [
+        _dumps({"custom_id": cid, "method": "POST", "url": "/v1/chat/completions", "body": body})
+        for cid, body in requests.items()
+    ]
+    batch_file = client.files.create(
+        file=("batch.jsonl", b"\n".join(lines) + b"\n"),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+
+    delay = BATCH_POLL_INITIAL_SECONDS
+    while batch.status not in _BATCH_TERMINAL:
+        time.sleep(delay)
+        delay = min(delay * 2, BATCH_POLL_MAX_SECONDS)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"OpenAI batch {batch.id} ended with status '{batch.status}'.")
+
+    out: Dict[str, str] = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        row = _loads(line)
+        response = row.get("response") or {}
+        if row.get("error") or response.get("status_code") != 200:
+            continue
+        choices = (response.get("body") or {}).get("choices") or []
+        if choices:
+            out[row["custom_id"]] = choices[0]["message"].get("content") or ""
+    return out
+
+
+def submit_review_batch(jobs: List[ReviewJob]) -> Dict[str, Any]:
+    """
+    Runs generate_code_review_report for many jobs through the Batch API:
+    one batch validates every distinct standards doc, a second reviews the
+    repos whose doc passed. Blocks until both batches finish.
+
+    Returns {job_id: report dict, or the exception for that job}.
+    """
+    client = _get_client()
+    results: Dict[str, Any] = {}
+
+    # Stage 1: one validator request per distinct standards text. A doc that
+    # can't be read fails only its own jobs.
+    texts: Dict[str, str] = {}
+    for job in jobs:
+        try:
+            texts[job.job_id] = _read_docx_text(job.standards_docx_path)
+        except Exception as e:
+            results[job.job_id] = e
+    by_text: Dict[str, str] = {}
+    for text in texts.values():
+        by_text.setdefault(text, f"validate-{len(by_text)}")
+    requests = {cid: _validation_request(text) for text, cid in by_text.items()}
+    keys = {cid: _request_key(request) for cid, request in requests.items()}
+    by_cid: Dict[str, Dict[str, Any]] = {}
+    for cid, key in keys.items():
+        cached = _get_cached_verdict(key)
+        if cached is not None:
+            by_cid[cid] = cached
+    misses = {cid: request for cid, request in requests.items() if cid not in by_cid}
+    raw_verdicts = _run_batch(client, misses) if misses else {}
+    for cid, raw in raw_verdicts.items():
+        try:
+            by_cid[cid] = _load_verdict(raw)
+        except ValueError:
+            continue
+        _put_cached_verdict(keys[cid], by_cid[cid])
+    verdicts: Dict[str, Dict[str, Any]] = {}
+    for job_id, text in texts.items():
+        cid = by_text[text]
+        if cid in by_cid:
+            verdicts[job_id] = copy.deepcopy(by_cid[cid])
+        else:
+            verdicts[job_id] = _parse_verdict(raw_verdicts.get(cid, ""))
+
+    # Stage 2: review every job whose standards doc was accepted
+    review_requests: Dict[str, Dict[str, Any]] = {}
+    for job in jobs:
+        if job.job_id not in verdicts:
+            continue
+        if not _is_valid_verdict(verdicts[job.job_id]):
+            results[job.job_id] = StandardsDocInvalidError()
+            continue
+        try:
+            code_pack = build_code_pack(job.repo_root)
+        except Exception as e:
+            results[job.job_id] = e
+            continue
+        request = _review_request(
+            standards_text=texts[job.job_id],
+            code_pack=code_pack,
+            project_name=job.project_name,
+            prepared_by=job.prepared_by,
+        )
+        cached = _get_cached_report(_request_key(request))
+        if cached is not None:
+            results[job.job_id] = _finalize_report(cached, verdicts[job.job_id])
+        else:
+            review_requests[job.job_id] = request
+
+    raw_reports = _run_batch(client, review_requests) if review_requests else {}
+    for job_id, request in review_requests.items():
+        try:
+            report = _parse_review(raw_reports.get(job_id, ""))
+            _put_cached_report(_request_key(request), report)
+            results[job_id] = _finalize_report(report, verdicts[job_id])
+        except Exception as e:
+            results[job_id] = e
+    return {job.job_id: results[job.job_id] for job in jobs}
+
@@ -0,0 +1,108 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python cosine fallback
+    np = None
+
+
+class SemanticVerdictCache:
+    """
+    Validator verdicts keyed by an embedding of the standards text, so a doc
+    that was only re-exported or lightly edited reuses the verdict of its
+    earlier version. Lookup returns the best match with cosine similarity of
+    at least `threshold`; least recently used entries beyond `max_entries`
+    are dropped.
+
+    `scope` separates entries that must never match each other, e.g. verdicts
+    from different validator prompts or models.
+    """
+
+    def __init__(self, path: Path, threshold: float = 0.97, max_entries: int = 1024):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        if not self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                " id INTEGER PRIMARY KEY,"
+                " scope TEXT NOT NULL,"
+                " emb BLOB NOT NULL,"
+                " verdict TEXT NOT NULL,"
+                " used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS verdicts_scope ON verdicts (scope)")
+            self._ready = True
+        return conn
+
+    def lookup(self, scope: str, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        q = _unit(embedding)
+        with self._lock:
+            try:
+                with closing(self._connect()) as conn, conn:
+                    rows = conn.execute("SELECT id, emb FROM verdicts WHERE scope = ?", (scope,)).fetchall()
+                    rows = [(rid, blob) for rid, blob in rows if len(blob) == 4 * len(q)]
+                    if not rows:
+                        return None
+
+                    sims = _similarities([blob for _, blob in rows], q)
+                    best = max(range(len(rows)), key=sims.__getitem__)
+                    if sims[best] < self.threshold:
+                        return None
+
+                    rid = rows[best][0]
+                    conn.execute("UPDATE verdicts SET used = ? WHERE id = ?", (time.time(), rid))
+                    (verdict,) = conn.execute("SELECT verdict FROM verdicts WHERE id = ?", (rid,)).fetchone()
+                    return json.loads(verdict)
+            except (OSError, sqlite3.Error):
+                return None
+
+    def store(self, scope: str, embedding: List[float], verdict: Dict[str, Any]) -> None:
+        blob = array("f", _unit(embedding)).tobytes()
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        "INSERT INTO verdicts (scope, emb, verdict, used) VALUES (?, ?, ?, ?)",
+                        (scope, blob, json.dumps(verdict, ensure_ascii=False), time.time()),
+                    )
+                    conn.execute(
+                        "DELETE FROM verdicts WHERE id NOT IN"
+                        " (SELECT id FROM verdicts ORDER BY used DESC LIMIT ?)",
+                        (self.max_entries,),
+                    )
+            except (OSError, sqlite3.Error):
+                # read-only filesystem etc.: the cache is best-effort
+                pass
+
+
+def _unit(v: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in v)) or 1.0
+    return [x / norm for x in v]
+
+
+def _similarities(blobs: List[bytes], q: List[float]) -> List[float]:
+    """Cosine similarity of unit query q against stored unit float32 vectors."""
+    if np is not None:
+        a = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(blobs), len(q))
+        return (a @ np.asarray(q, dtype=np.float32)).tolist()
+    out: List[float] = []
+    for blob in blobs:
+        v = array("f")
+        v.frombytes(blob)
+        out.append(sum(a * b for a, b in zip(v, q)))
+    return out